@@ -9,19 +9,40 @@
 #     sys.exit(main())
 #!/usr/bin/env python
 import argparse
+import multiprocessing
+import sys
 from pathlib import Path
 
+from . import watch
+from .content import DEFAULT_WORKERS, HASH_FILE
+from .guard import DEFAULT_TIMEOUT
+from .index import INDEX_FILE
+from .normalize import MAX_NAME_BYTES, PROFILES, UNICODE_FORMS, compile_normalizer
+from .plan import FOLD_MODES
 from .renamer import (
     apply_from_config,
     confirm_and_apply,
-    rename_files,
+    iter_rename_plan,
+    recover_main,
     show_history,
     undo_last,
 )
+from .scanner import SORT_ORDERS
 
 
 def main():
-    parser = argparse.ArgumentParser(description="File Renamer CLI")
+    multiprocessing.freeze_support()  # guard workers in frozen builds
+    if sys.argv[1:2] == ["watch"]:
+        watch.main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["recover"]:
+        recover_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="File Renamer CLI",
+        epilog="Run 'watch --help' or 'recover --help' for the subcommands.",
+    )
     parser.add_argument("directory", nargs="?", help="Directory containing files")
     parser.add_argument(
         "match_pattern", nargs="?", help="Regex pattern to match filenames"
@@ -34,6 +55,32 @@ def main():
     parser.add_argument("--mode", choices=["pattern", "increment"], default="pattern")
     parser.add_argument("--start", type=int, default=1)
     parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--walk-workers", type=int, default=1)
+    parser.add_argument("--match-glob", help="Glob filenames must match, ie. *.txt")
+    parser.add_argument("--exclude", action="append", help="Glob of names to skip")
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--skip-hidden", action="store_true")
+    parser.add_argument(
+        "--index", nargs="?", const=INDEX_FILE, help="Cache directory listings"
+    )
+    parser.add_argument("--regex-timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--normalize", choices=PROFILES, default="windows")
+    parser.add_argument("--unicode-form", choices=UNICODE_FORMS)
+    parser.add_argument("--max-name-bytes", type=int, default=MAX_NAME_BYTES)
+    parser.add_argument("--sort", choices=SORT_ORDERS, default="name")
+    parser.add_argument("--reverse", action="store_true")
+    parser.add_argument("--content-workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        "--hash-cache", nargs="?", const=HASH_FILE, help="Cache file hashes"
+    )
+    parser.add_argument("--fold-collisions", choices=FOLD_MODES)
+    parser.add_argument("--rename-workers", type=int, default=1)
+    parser.add_argument("--per-directory", action="store_true")
+    parser.add_argument("--failure-report", help="JSON file for failed renames")
+    parser.add_argument("--preview-limit", type=int)
+    parser.add_argument("--preview-summary", action="store_true")
+    parser.add_argument("--preview-out", help="Write the full preview to a file")
+    parser.add_argument("--no-progress", action="store_true")
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--yes", action="store_true")
     parser.add_argument("--undo", action="store_true")
@@ -59,15 +106,43 @@ def main():
         )
 
     directory = Path(args.directory).resolve()
-    changes = rename_files(
+    timed_out = []
+    changes = iter_rename_plan(
         directory,
         args.match_pattern,
         args.replace_pattern,
         args.mode,
         args.start,
         args.recursive,
+        args.walk_workers,
+        args.match_glob,
+        args.exclude,
+        args.max_depth,
+        args.skip_hidden,
+        args.index,
+        args.regex_timeout,
+        compile_normalizer(args.normalize, args.unicode_form, args.max_name_bytes),
+        args.sort,
+        args.reverse,
+        args.content_workers,
+        args.hash_cache,
+        not args.no_progress,
+        timed_out,
+    )
+    confirm_and_apply(
+        changes,
+        dry_run=args.dry_run,
+        auto_confirm=args.yes,
+        fold_collisions=args.fold_collisions,
+        workers=args.rename_workers,
+        per_directory=args.per_directory,
+        failure_report=args.failure_report,
+        progress=not args.no_progress,
+        preview_limit=args.preview_limit,
+        preview_summary=args.preview_summary,
+        preview_out=args.preview_out,
+        timed_out=timed_out,
     )
-    confirm_and_apply(changes, dry_run=args.dry_run, auto_confirm=args.yes)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .index import RACY_WINDOW_NS
+from .media import MEDIA_TOKENS, read_media_tags
+
+HASH_FILE = ".rename_hashes.sqlite"
+HASH_ALGORITHMS = ("md5", "sha1", "sha256")
+DEFAULT_WORKERS = 4
+
+# Template tokens computed from file contents, see ``content_values``.
+CONTENT_TOKENS = set(HASH_ALGORITHMS) | set(MEDIA_TOKENS)
+
+_CHUNK = 1024 * 1024
+
+
+class Digest(str):
+    """Hex digest whose format spec is a length: ``{sha256:12}``."""
+
+    def __format__(self, spec):
+        if spec.isdigit():
+            return self[: int(spec)]
+        return super().__format__(spec)
+
+
+class _Missing(str):
+    """Value of a media token the file does not have; renders empty."""
+
+    def __format__(self, spec):
+        return ""
+
+
+MISSING = _Missing()
+
+
+def file_digests(path, algorithms):
+    """
+    Hash ``path`` with each of ``algorithms`` in a single pass of 1 MiB
+    unbuffered reads. ``hashlib`` releases the GIL while hashing chunks this
+    size, so several files hash in parallel on threads.
+    """
+    hashers = [hashlib.new(name) for name in algorithms]
+    buffer = bytearray(_CHUNK)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            for hasher in hashers:
+                hasher.update(view[:size])
+    return {name: hasher.hexdigest() for name, hasher in zip(algorithms, hashers)}
+
+
+class HashCache:
+    """
+    On-disk cache of file digests keyed by device, inode, size and mtime.
+
+    A file whose size or mtime changed since it was hashed is hashed again,
+    so re-running over an unchanged tree reads no file contents. Safe to use
+    from the hashing threads.
+    """
+
+    def __init__(self, path=HASH_FILE):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "dev INTEGER, inode INTEGER, algorithm TEXT, size INTEGER, "
+            "mtime_ns INTEGER, digest TEXT, PRIMARY KEY (dev, inode, algorithm))"
+        )
+
+    def get(self, st, algorithm):
+        """The cached digest for a file with stat result ``st``, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, digest FROM hashes "
+                "WHERE dev = ? AND inode = ? AND algorithm = ?",
+                (st.st_dev, st.st_ino, algorithm),
+            ).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        return None
+
+    def put(self, st, algorithm, digest):
+        if time.time_ns() - st.st_mtime_ns <= RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, algorithm, st.st_size, st.st_mtime_ns, digest),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def content_values(entry, names, cache=None):
+    """
+    Compute the ``CONTENT_TOKENS`` in ``names`` for ``entry``. Media tokens
+    share one header read; those the file lacks are ``MISSING``.
+    """
+    values = {}
+    tags = [name for name in names if name in MEDIA_TOKENS]
+    if tags:
+        found = read_media_tags(entry.path)
+        for name in tags:
+            values[name] = found.get(name, MISSING)
+
+    algorithms = [name for name in names if name in HASH_ALGORITHMS]
+    if not algorithms:
+        return values
+    st = entry.stat()
+    if cache is not None:
+        for name in algorithms:
+            digest = cache.get(st, name)
+            if digest is not None:
+                values[name] = Digest(digest)
+    missing = [name for name in algorithms if name not in values]
+    if missing:
+        for name, digest in file_digests(entry.path, missing).items():
+            if cache is not None:
+                cache.put(st, name, digest)
+            values[name] = Digest(digest)
+    return values
+
+
+class ContentEntry:
+    """``os.DirEntry`` wrapper carrying content token values computed ahead."""
+
+    __slots__ = ("entry", "name", "path", "values")
+
+    def __init__(self, entry, values):
+        self.entry = entry
+        self.name = entry.name
+        self.path = entry.path
+        self.values = values
+
+    def is_dir(self, follow_symlinks=True):
+        return self.entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, follow_symlinks=True):
+        return self.entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self.entry.is_symlink()
+
+    def stat(self, follow_symlinks=True):
+        return self.entry.stat(follow_symlinks=follow_symlinks)
+
+    def inode(self):
+        return self.entry.inode()
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"<ContentEntry {self.name!r}>"
+
+
+def token_getter(name):
+    """Template getter for content token ``name``; uses prefetched values."""
+
+    def get(entry):
+        values = getattr(entry, "values", None)
+        if values is None or name not in values:
+            values = content_values(entry, (name,))
+        return values[name]
+
+    return get
+
+
+def prefetch_content(entries, wanted, names, workers=DEFAULT_WORKERS, cache=None):
+    """
+    Yield ``entries`` in order, with the content tokens ``names`` of those
+    whose name passes ``wanted`` computed on a pool of ``workers`` threads
+    and attached as ``ContentEntry.values``.
+
+    At most ``workers * 4`` files are read ahead of the consumer. Files that
+    cannot be read are yielded unchanged, so the error surfaces where the
+    token is rendered.
+    """
+    names = tuple(names)
+    window = max(workers, 1) * 4
+    queue = deque()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+
+        def drain():
+            entry, future = queue.popleft()
+            if future is None:
+                return entry
+            try:
+                return ContentEntry(entry, future.result())
+            except OSError:
+                return entry
+
+        try:
+            for entry in entries:
+                future = None
+                if wanted(entry.name):
+                    future = pool.submit(content_values, entry, names, cache)
+                queue.append((entry, future))
+                if len(queue) >= window:
+                    yield drain()
+            while queue:
+                yield drain()
+        finally:
+            for _, future in queue:
+                if future is not None:
+                    future.cancel()
+
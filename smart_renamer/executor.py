@@ -0,0 +1,382 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import ctypes
+import ctypes.util
+import errno
+import os
+import sys
+import threading
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .journal import JOURNAL_BATCH
+from .plan import is_temp
+
+Failure = namedtuple("Failure", "old new reason")
+
+RENAME_NOREPLACE = 1
+RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
+# Errors meaning the kernel or filesystem lacks renameat2 or the flag.
+_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP}
+
+# Rename by name relative to open directory descriptors where supported.
+DIR_FD_RENAME = os.rename in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+MAX_OPEN_DIRS = 256
+
+
+class DirHandles:
+    """
+    Open descriptors of the directories being renamed in, shared by the
+    renaming threads.
+
+    Each directory is opened once and kept open while it is in use, so
+    renames resolve a bare name instead of walking the whole path, and keep
+    working if a parent directory is moved mid-run. At most
+    ``MAX_OPEN_DIRS`` idle descriptors stay open, least recently used first
+    out.
+    """
+
+    def __init__(self, limit=MAX_OPEN_DIRS):
+        self._lock = threading.Lock()
+        self._limit = limit
+        self._open = OrderedDict()  # directory -> [fd, users]
+
+    def acquire(self, directory):
+        with self._lock:
+            item = self._open.get(directory)
+            if item is None:
+                fd = os.open(directory or os.curdir, os.O_RDONLY | os.O_DIRECTORY)
+                item = self._open[directory] = [fd, 1]
+                self._evict()
+            else:
+                self._open.move_to_end(directory)
+                item[1] += 1
+            return item[0]
+
+    def release(self, directory):
+        with self._lock:
+            self._open[directory][1] -= 1
+            self._evict()
+
+    def _evict(self):
+        if len(self._open) <= self._limit:
+            return
+        for directory, (fd, users) in list(self._open.items()):
+            if len(self._open) <= self._limit:
+                break
+            if not users:
+                os.close(fd)
+                del self._open[directory]
+
+    def close(self):
+        with self._lock:
+            for fd, _ in self._open.values():
+                os.close(fd)
+            self._open.clear()
+
+
+def _load_renameat2():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        function = libc.renameat2  # glibc 2.28+
+    except (OSError, AttributeError):
+        return None
+    function.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    function.restype = ctypes.c_int
+    return function
+
+
+_renameat2 = _load_renameat2()
+_unsupported = set()  # (directory, flags) renameat2 was refused for
+
+
+def renameat2(src_fd, src, dst_fd, dst, flags):
+    """
+    Linux ``renameat2``: ``RENAME_NOREPLACE`` fails with FileExistsError
+    instead of overwriting ``dst``, ``RENAME_EXCHANGE`` atomically swaps
+    two existing names. Raises OSError; ENOSYS when unavailable.
+    """
+    if _renameat2 is None:
+        raise OSError(errno.ENOSYS, os.strerror(errno.ENOSYS), src)
+    result = _renameat2(src_fd, os.fsencode(src), dst_fd, os.fsencode(dst), flags)
+    if result != 0:
+        code = ctypes.get_errno()
+        raise OSError(code, os.strerror(code), src, None, dst)
+
+
+def _move(old, new, handles, flags):
+    """
+    Rename ``old`` to ``new`` with ``renameat2(flags)``, relative to open
+    directory descriptors when ``handles`` is given. Falls back to
+    ``os.rename`` where renameat2 or the flag is not supported, except for
+    ``RENAME_EXCHANGE``, which then raises the OSError.
+    """
+    src_dir, src_name = os.path.split(os.fspath(old))
+    dst_dir, dst_name = os.path.split(os.fspath(new))
+    if handles is None:
+        src_fd = dst_fd = _AT_FDCWD
+        src_name, dst_name = os.fspath(old), os.fspath(new)
+    else:
+        src_fd = handles.acquire(src_dir)
+    try:
+        if handles is not None:
+            dst_fd = src_fd if dst_dir == src_dir else handles.acquire(dst_dir)
+        try:
+            if _renameat2 is not None and (src_dir, flags) not in _unsupported:
+                try:
+                    renameat2(src_fd, src_name, dst_fd, dst_name, flags)
+                    return
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+                    _unsupported.add((src_dir, flags))
+            if flags & RENAME_EXCHANGE:
+                raise OSError(errno.ENOSYS, "RENAME_EXCHANGE is not supported")
+            if handles is None:
+                os.rename(src_name, dst_name)
+            else:
+                os.rename(src_name, dst_name, src_dir_fd=src_fd, dst_dir_fd=dst_fd)
+        finally:
+            if handles is not None and dst_dir != src_dir:
+                handles.release(dst_dir)
+    finally:
+        if handles is not None:
+            handles.release(src_dir)
+
+
+def rename_noreplace(old, new):
+    """
+    Rename ``old`` to ``new`` without overwriting: raises FileExistsError
+    if ``new`` exists, atomically where renameat2 is available.
+    """
+    if os.path.lexists(new):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), os.fspath(new))
+    _move(old, new, None, RENAME_NOREPLACE)
+
+
+def _swap(chain, i):
+    """
+    Whether ``chain[i : i + 3]`` is a two-file swap broken with a temporary
+    name (``a -> tmp, b -> a, tmp -> b``), as made by ``plan.resolve_plan``.
+    """
+    if i + 3 > len(chain):
+        return False
+    (a, temp), (b, a2), (temp2, b2) = chain[i : i + 3]
+    return is_temp(temp) and temp == temp2 and a == a2 and b == b2
+
+
+def chains(steps):
+    """
+    Split ``plan.resolve_plan`` steps into chains that must run in order.
+
+    A step depends on the step that frees its new name, and each name is
+    freed and claimed at most once, so dependent steps form simple chains.
+    Different chains touch different names and can run concurrently.
+    """
+    result = []
+    by_vacated = {}  # old name of a step -> the chain it belongs to
+    for old, new in steps:
+        chain = by_vacated.pop(os.fspath(new), None)
+        if chain is None:
+            chain = []
+            result.append(chain)
+        chain.append((old, new))
+        by_vacated[os.fspath(old)] = chain
+    return result
+
+
+def _exchanged(a, b, exchanges):
+    """Whether the journal's ``exchanges`` show ``a`` and ``b`` were swapped."""
+    record = exchanges.get((a, b))
+    if record is None:
+        return False
+    inode_a, inode_b, finished = record
+    if finished:
+        return True
+    # Interrupted around the swap itself: the inodes tell which side it was.
+    try:
+        return os.lstat(a).st_ino == inode_b and os.lstat(b).st_ino == inode_a
+    except OSError:
+        return False
+
+
+def ran_steps(chain, done, exchanges):
+    """
+    Count the leading steps of ``chain`` that ran before a session was
+    interrupted, from the journal's ``done`` set and ``exchanges`` (see
+    ``journal.read_journal``) and the filesystem.
+
+    Steps run in order, so the last one seen to have run (its old name is
+    gone and its new name exists) also accounts for the ones before it.
+    A step out of a temporary name only counts if the step that created
+    that name did: the temporary name never existed otherwise.
+    """
+    ran = 0
+    created = {}  # temporary name -> index of the step that creates it
+    i = 0
+    while i < len(chain):
+        old, new = chain[i]
+        if _swap(chain, i) and _exchanged(old, chain[i + 1][0], exchanges):
+            ran = i = i + 3
+            continue
+        if (old, new) in done:
+            ran = i + 1
+        elif is_temp(old) and ran <= created.get(old, len(chain)):
+            pass
+        elif not os.path.lexists(old) and os.path.lexists(new):
+            ran = i + 1
+        if is_temp(new):
+            created[new] = i
+        i += 1
+    return ran
+
+
+def _run_chain(chain, locks, handles, journal=None):
+    applied = []
+    failures = []
+    i = 0
+    while i < len(chain):
+        old, new = chain[i]
+        lock = locks[os.path.dirname(os.fspath(old))] if locks is not None else None
+        if lock is not None:
+            lock.acquire()
+        try:
+            if _swap(chain, i):
+                # One atomic exchange instead of three renames via the
+                # temporary name, when the filesystem supports it.
+                b = chain[i + 1][0]
+                if journal is not None:
+                    journal.exchanging(old, b)
+                try:
+                    _move(old, b, handles, RENAME_EXCHANGE)
+                    if journal is not None:
+                        journal.exchanged(old, b)
+                    applied.extend(chain[i : i + 3])
+                    i += 3
+                    continue
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+            _move(old, new, handles, RENAME_NOREPLACE)
+        except Exception as e:
+            failures.append(Failure(old, new, str(e)))
+            # Every later step waits for a name this one did not free.
+            waiting = old
+            for later_old, later_new in chain[i + 1 :]:
+                reason = f"{waiting.name} was not renamed"
+                failures.append(Failure(later_old, later_new, reason))
+                waiting = later_old
+            break
+        finally:
+            if lock is not None:
+                lock.release()
+        applied.append((old, new))
+        i += 1
+    return applied, failures
+
+
+class _Locks(dict):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def __missing__(self, directory):
+        with self._lock:
+            return self.setdefault(directory, threading.Lock())
+
+
+def _journaled(chain_list, journal):
+    """Yield ``chain_list``, recording each batch's intent before its first chain."""
+    if journal is None:
+        yield from chain_list
+        return
+    batch = []
+    size = 0
+    for chain in chain_list:
+        batch.append(chain)
+        size += len(chain)
+        if size >= JOURNAL_BATCH:
+            journal.intend([step for chain in batch for step in chain])
+            yield from batch
+            batch = []
+            size = 0
+    if batch:
+        journal.intend([step for chain in batch for step in chain])
+        yield from batch
+
+
+def execute_plan(
+    steps, workers=1, per_directory=False, failures=None, journal=None
+):
+    """
+    Rename ``steps`` (from ``plan.resolve_plan``) and yield the ones that
+    succeeded.
+
+    With ``workers`` > 1 independent chains run on a thread pool of that
+    size, which hides the round trip of each rename on network filesystems;
+    steps within a chain keep their order. At most ``workers * 4`` chains
+    are queued ahead. ``per_directory`` allows only one rename at a time
+    per directory. Where the platform allows (``DIR_FD_RENAME``), renames
+    go through ``DirHandles`` with bare names.
+
+    On Linux each rename is a single ``renameat2(RENAME_NOREPLACE)`` call
+    that fails instead of overwriting a file that appeared since the plan
+    was made, and two-file swaps use one ``RENAME_EXCHANGE``. Filesystems
+    that refuse either fall back to ``os.rename`` and the temporary name.
+
+    Nothing is printed: a ``Failure(old, new, reason)`` is appended to
+    ``failures`` for each step that failed, and for each later step of its
+    chain, which is skipped so nothing is overwritten.
+
+    With a ``journal.Journal``, the steps of every batch of chains are
+    recorded and synced before the first of them runs, and applied steps
+    are marked done. Swaps are recorded before and after the exchange.
+    """
+    if failures is None:
+        failures = []
+    locks = _Locks() if per_directory else None
+    handles = DirHandles() if DIR_FD_RENAME else None
+    try:
+        if workers <= 1:
+            for chain in _journaled(chains(steps), journal):
+                applied, failed = _run_chain(chain, locks, handles, journal)
+                failures.extend(failed)
+                if journal is not None:
+                    journal.done(applied)
+                yield from applied
+            return
+
+        window = workers * 4
+        queue = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                for chain in _journaled(chains(steps), journal):
+                    future = pool.submit(_run_chain, chain, locks, handles, journal)
+                    queue.append(future)
+                    while len(queue) >= window:
+                        applied, failed = queue.popleft().result()
+                        failures.extend(failed)
+                        if journal is not None:
+                            journal.done(applied)
+                        yield from applied
+                while queue:
+                    applied, failed = queue.popleft().result()
+                    failures.extend(failed)
+                    if journal is not None:
+                        journal.done(applied)
+                    yield from applied
+            finally:
+                for future in queue:
+                    future.cancel()
+    finally:
+        if handles is not None:
+            handles.close()
@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import fnmatch
+import os
+import re
+
+try:  # Python 3.11+; guard and templates import sre_parse from here
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+_GLOB_SPECIAL = "*?[]"
+_CASE_INSENSITIVE = os.path.normcase("A") == "a"
+
+
+def _literal_tail(pattern):
+    """Return the literal text a glob must end with, ie. '.txt' for '*.txt'."""
+    for i in range(len(pattern) - 1, -1, -1):
+        if pattern[i] in _GLOB_SPECIAL:
+            return pattern[i + 1 :]
+    return pattern
+
+
+def compile_glob(pattern):
+    """
+    Compile a glob such as ``*.txt`` into a ``name -> bool`` predicate.
+
+    The glob is translated to a regex once. Its literal tail (usually the
+    extension) is checked with ``str.endswith`` first, so names of any other
+    extension are rejected without running the regex at all.
+    """
+    if _CASE_INSENSITIVE:
+        pattern = pattern.lower()
+    match = re.compile(fnmatch.translate(pattern)).match
+    tail = _literal_tail(pattern)
+
+    if _CASE_INSENSITIVE:
+
+        def predicate(name):
+            name = name.lower()
+            return name.endswith(tail) and match(name) is not None
+
+    elif tail:
+
+        def predicate(name):
+            return name.endswith(tail) and match(name) is not None
+
+    else:
+
+        def predicate(name):
+            return match(name) is not None
+
+    return predicate
+
+
+def compile_globs(patterns):
+    """Compile several globs into a single ``name -> bool`` predicate."""
+    if _CASE_INSENSITIVE:
+        patterns = [pattern.lower() for pattern in patterns]
+    match = re.compile("|".join(fnmatch.translate(p) for p in patterns)).match
+    if _CASE_INSENSITIVE:
+        return lambda name: match(name.lower()) is not None
+    return lambda name: match(name) is not None
+
+
+def _flatten(tokens):
+    """Inline the contents of plain groups so adjacent literals join up."""
+    for op, av in tokens:
+        if op is sre_parse.SUBPATTERN and not av[1] & re.IGNORECASE:
+            yield from _flatten(av[-1])
+        else:
+            yield op, av
+
+
+def _literal_runs(tokens):
+    """Yield ``(first, last, text)`` for each run of consecutive literals."""
+    first = None
+    text = []
+    for i, (op, av) in enumerate(tokens):
+        if op is sre_parse.LITERAL:
+            if first is None:
+                first = i
+            text.append(chr(av))
+        elif first is not None:
+            yield first, i - 1, "".join(text)
+            first = None
+            text = []
+    if first is not None:
+        yield first, len(tokens) - 1, "".join(text)
+
+
+def subpatterns(av):
+    """Yield the nested token lists held in an opcode argument."""
+    if not isinstance(av, (tuple, list)):
+        return
+    for item in av:
+        if isinstance(item, sre_parse.SubPattern):
+            yield item
+        elif isinstance(item, list):
+            for sub in item:
+                if isinstance(sub, sre_parse.SubPattern):
+                    yield sub
+
+
+def _walk(tokens):
+    """Yield every opcode of a parsed pattern, including nested ones."""
+    for op, av in tokens:
+        yield op
+        for sub in subpatterns(av):
+            yield from _walk(sub)
+
+
+def has_backreferences(regex):
+    """True if ``regex`` refers back to its own groups (``\\1``, ``(?(1)...)``)."""
+    tokens = sre_parse.parse(regex.pattern, regex.flags)
+    return any(str(op).startswith("GROUPREF") for op in _walk(tokens))
+
+
+def required_literals(regex):
+    """
+    Return ``(prefix, suffixes, substring)`` that every name ``regex`` can
+    match must satisfy, or ``None`` if the pattern has no required literal.
+
+    The pattern is parsed once with ``sre_parse``. ``prefix`` is literal text
+    anchored at the start, ``suffixes`` a tuple for ``str.endswith`` built
+    from text anchored at the end, and ``substring`` the longest other
+    literal run. Empty values mean no constraint.
+    """
+    if regex.flags & re.IGNORECASE or not isinstance(regex.pattern, str):
+        return None
+    tokens = list(_flatten(sre_parse.parse(regex.pattern, regex.flags)))
+    multiline = regex.flags & re.MULTILINE
+    starts = {sre_parse.AT_BEGINNING_STRING}
+    ends = {sre_parse.AT_END_STRING}
+    if not multiline:
+        starts.add(sre_parse.AT_BEGINNING)
+        ends.add(sre_parse.AT_END)
+
+    prefix = ""
+    suffixes = ("",)
+    substring = ""
+    for first, last, text in _literal_runs(tokens):
+        before = tokens[first - 1] if first else None
+        after = tokens[last + 1] if last + 1 < len(tokens) else None
+        if before and before[0] is sre_parse.AT and before[1] in starts:
+            prefix = text
+        elif after and after[0] is sre_parse.AT and after[1] in ends:
+            # "$" also matches just before a trailing newline.
+            if after[1] is sre_parse.AT_END:
+                suffixes = (text, text + "\n")
+            else:
+                suffixes = (text,)
+        elif len(text) > len(substring):
+            substring = text
+
+    if not (prefix or suffixes[0] or substring):
+        return None
+    return prefix, suffixes, substring
+
+
+def compile_literal_filter(regex):
+    """
+    Return a ``name -> bool`` predicate that rejects names ``regex`` can
+    never match, or ``None`` if the pattern has no required literal.
+
+    The literals from ``required_literals`` are checked with
+    ``startswith``/``endswith``/``in``, all of which are much cheaper than
+    ``regex.search``.
+    """
+    literals = required_literals(regex)
+    if literals is None:
+        return None
+    prefix, suffixes, substring = literals
+
+    def predicate(name):
+        return (
+            name.startswith(prefix)
+            and name.endswith(suffixes)
+            and substring in name
+        )
+
+    return predicate
@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import multiprocessing
+
+from .filters import sre_parse, subpatterns
+
+DEFAULT_TIMEOUT = 1.0  # seconds per file for patterns flagged as risky
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+
+
+def _has_unbounded_repeat(tokens):
+    for op, av in tokens:
+        if op in _REPEATS and av[1] is sre_parse.MAXREPEAT:
+            return True
+        if any(_has_unbounded_repeat(sub) for sub in subpatterns(av)):
+            return True
+    return False
+
+
+def _first_literal(tokens):
+    """The literal a branch alternative starts with, or None if unknown."""
+    for op, av in tokens:
+        if op is sre_parse.LITERAL:
+            return av
+        if op is sre_parse.SUBPATTERN:
+            return _first_literal(av[-1])
+        return None
+    return None
+
+
+def _has_overlapping_branch(tokens):
+    for op, av in tokens:
+        if op is sre_parse.BRANCH:
+            # Two empty alternatives overlap too, as in (a|a) after the
+            # parser factors out the common prefix.
+            firsts = [_first_literal(alt) if len(alt) else "" for alt in av[1]]
+            if None in firsts or len(set(firsts)) < len(firsts):
+                return True
+        if any(_has_overlapping_branch(sub) for sub in subpatterns(av)):
+            return True
+    return False
+
+
+def _find_risk(tokens):
+    for op, av in tokens:
+        # A bounded outer repeat such as (a+){12} still splits the input
+        # between its iterations in exponentially many ways.
+        if op in _REPEATS and av[1] > 1:
+            body = av[2]
+            if _has_unbounded_repeat(body):
+                return "nested quantifier"
+            if _has_overlapping_branch(body):
+                return "overlapping alternation inside a quantifier"
+        for sub in subpatterns(av):
+            risk = _find_risk(sub)
+            if risk:
+                return risk
+    return None
+
+
+def find_catastrophic(regex):
+    """
+    Statically check ``regex`` for constructs that can backtrack
+    exponentially, like ``(a+)+$`` or ``(a|a)*$``.
+
+    Returns a short description of the problem, or ``None`` if the pattern
+    looks safe. The check is conservative: it may flag patterns that are
+    fine in practice, which then only cost the guarded execution.
+    """
+    return _find_risk(sre_parse.parse(regex.pattern, regex.flags))
+
+
+def _serve(conn, factory, args):
+    rule = factory(*args)
+    conn.send(None)  # ready
+    while True:
+        try:
+            name = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, rule.guarded_match(name)))
+        except Exception as e:
+            conn.send((False, e))
+
+
+class SpanMatch:
+    """
+    Stand-in for the ``re.Match`` of ``regex`` on ``string``, rebuilt from
+    the group spans a worker returned, for rendering templates.
+    """
+
+    def __init__(self, regex, string, spans):
+        self.re = regex
+        self.string = string
+        self._spans = spans
+
+    def _value(self, group):
+        index = self.re.groupindex[group] if isinstance(group, str) else group
+        start, end = self._spans[index]
+        return None if start < 0 else self.string[start:end]
+
+    def group(self, *groups):
+        if len(groups) > 1:
+            return tuple(self._value(group) for group in groups)
+        return self._value(groups[0] if groups else 0)
+
+    def groupdict(self, default=None):
+        values = {name: self._value(name) for name in self.re.groupindex}
+        return {name: default if v is None else v for name, v in values.items()}
+
+
+class RegexWorker:
+    """
+    Runs ``factory(*args).guarded_match(name)`` in a child process.
+
+    A call that takes longer than ``timeout`` seconds kills the child and
+    raises ``TimeoutError``. The next call starts a fresh child, so one
+    runaway match never stalls the rest of the batch.
+    """
+
+    def __init__(self, factory, args, timeout):
+        self._factory = factory
+        self._args = args
+        self.timeout = timeout
+        self._process = None
+        self._conn = None
+
+    def _start(self):
+        self._conn, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child, self._factory, self._args), daemon=True
+        )
+        self._process.start()
+        child.close()
+        self._conn.recv()  # startup is not part of the time budget
+
+    def call(self, name):
+        if self._process is None:
+            self._start()
+        self._conn.send(name)
+        if not self._conn.poll(self.timeout):
+            self.close()
+            raise TimeoutError(name)
+        ok, value = self._conn.recv()
+        if not ok:
+            raise value
+        return value
+
+    def close(self):
+        if self._process is None:
+            return
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
@@ -1,16 +1,29 @@
 # # SPDX-License-Identifier: MIT
 # # Copyright (c) 2025 Coby Amar
 import json
+import multiprocessing
+import queue
+import threading
 import tkinter as tk
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
 
-from .renamer import apply_from_config, confirm_and_apply, rename_files, undo_last
+from .renamer import (
+    apply_from_config,
+    confirm_and_apply,
+    iter_rule_plan,
+    rename_files,
+    undo_last,
+)
+from .rules import RenameRule
 
 
 class RenamerGUI:
     def __init__(self, root):
         self.root = root
+        self._previews = queue.Queue()  # (preview id, lines, timed out, error)
+        self._preview_id = 0
+        self._scans = 0  # preview scans still running
         root.title("File Renamer GUI")
         root.geometry("600x450")
 
@@ -96,15 +109,56 @@ class RenamerGUI:
         if not directory or not match_pattern or not replace_pattern:
             return
 
-        dir_path = Path(directory)
         try:
-            changes = rename_files(
-                dir_path, match_pattern, replace_pattern, mode, start
-            )
-            for old, new in changes:
-                self.preview_list.insert(tk.END, f"{old.name} -> {new.name}")
+            rule = RenameRule(match_pattern, replace_pattern, mode, start)
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+        # Risky patterns run with a per-file time budget. The scan runs on a
+        # thread so files that exceed it don't freeze the window meanwhile.
+        self._preview_id += 1
+        threading.Thread(
+            target=self._scan_preview,
+            args=(self._preview_id, Path(directory), rule),
+            daemon=True,
+        ).start()
+        if not self._scans:
+            self.root.after(100, self._show_preview)
+        self._scans += 1
+
+    def _scan_preview(self, preview_id, dir_path, rule):
+        timed_out = []
+        try:
+            lines = [
+                f"{old.name} -> {new.name}"
+                for old, new in iter_rule_plan(dir_path, rule, timed_out=timed_out)
+            ]
+            self._previews.put((preview_id, lines, timed_out, None))
+        except Exception as e:
+            self._previews.put((preview_id, [], timed_out, e))
+
+    def _show_preview(self):
+        """Show finished scans from the Tk thread, dropping superseded ones."""
+        try:
+            preview_id, lines, timed_out, error = self._previews.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._show_preview)
+            return
+        self._scans -= 1
+        if self._scans:
+            self.root.after(100, self._show_preview)
+        if preview_id != self._preview_id:
+            return
+        if error is not None:
+            messagebox.showerror("Error", str(error))
+            return
+        self.preview_list.insert(tk.END, *lines)
+        if timed_out:
+            messagebox.showwarning(
+                "Warning",
+                f"Matching timed out on {len(timed_out)} files, "
+                "they are left unchanged.",
+            )
 
     def apply_rename(self):
         directory = self.dir_entry.get()
@@ -155,6 +209,7 @@ class RenamerGUI:
 
 
 def main():
+    multiprocessing.freeze_support()  # guard workers in frozen builds
     root = tk.Tk()
     RenamerGUI(root)
     root.mainloop()
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import os
+import sqlite3
+import threading
+import time
+
+from .scanner import list_dir
+
+INDEX_FILE = ".rename_index.sqlite"
+
+# Entries modified this recently are not cached: a second change within the
+# same mtime tick would otherwise go unnoticed on the next run.
+RACY_WINDOW_NS = 2_000_000_000
+
+_FILE = "f"
+_DIR = "d"
+_OTHER = "o"
+
+
+class CachedEntry:
+    """Stand-in for ``os.DirEntry`` rebuilt from an index row."""
+
+    __slots__ = ("name", "path", "_kind", "_stat")
+
+    def __init__(self, directory, name, kind):
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._kind = kind
+        self._stat = None
+
+    def is_dir(self, follow_symlinks=True):
+        return self._kind == _DIR
+
+    def is_file(self, follow_symlinks=True):
+        return self._kind == _FILE
+
+    def is_symlink(self):
+        return os.path.islink(self.path)
+
+    def stat(self, follow_symlinks=True):
+        if not follow_symlinks:
+            return os.stat(self.path, follow_symlinks=False)
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def inode(self):
+        return self.stat(follow_symlinks=False).st_ino
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"<CachedEntry {self.name!r}>"
+
+
+def _kind(entry):
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            return _DIR
+        if entry.is_file():
+            return _FILE
+    except OSError:
+        pass
+    return _OTHER
+
+
+def _encode(entries):
+    return b"\0".join(
+        _kind(entry).encode() + os.fsencode(entry.name) for entry in entries
+    )
+
+
+def _decode(directory, blob):
+    if not blob:
+        return []
+    return [
+        CachedEntry(directory, os.fsdecode(record[1:]), chr(record[0]))
+        for record in blob.split(b"\0")
+    ]
+
+
+class ListingIndex:
+    """
+    On-disk cache of directory listings, keyed by each directory's inode and
+    mtime.
+
+    ``list_dir`` answers from the cache when the directory's inode and mtime
+    are unchanged since it was stored, costing one stat instead of a full
+    listing. Any entry added, removed or renamed updates the directory mtime
+    and triggers a fresh ``os.scandir``. Safe to use from the walker's
+    worker threads.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "path BLOB PRIMARY KEY, inode INTEGER, mtime_ns INTEGER, entries BLOB)"
+        )
+
+    def list_dir(self, path):
+        """Drop-in replacement for ``scanner.list_dir`` backed by the index."""
+        path = os.fspath(path)
+        key = os.fsencode(path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT inode, mtime_ns, entries FROM listings WHERE path = ?",
+                (key,),
+            ).fetchone()
+        if row is not None and row[0] == st.st_ino and row[1] == st.st_mtime_ns:
+            return _decode(path, row[2])
+
+        entries = list_dir(path)
+        if time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                    (key, st.st_ino, st.st_mtime_ns, _encode(entries)),
+                )
+        return entries
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_FILE = ".rename_journal.jsonl"
+JOURNAL_BATCH = 1000  # renames made durable per fsync
+
+
+def _fsync_directory(path):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # not possible on Windows, the file itself is still synced
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """
+    Write-ahead log of a rename session, one JSON record per line.
+
+    ``intend`` records a batch of renames and fsyncs before any of them
+    runs, so one sync covers ``JOURNAL_BATCH`` renames. ``done`` records
+    finished renames without syncing; they only speed up recovery, which
+    can also tell from the filesystem. An atomic swap leaves no trace
+    there, so ``exchanging`` and ``exchanged`` record it, synced, on both
+    sides. The file is removed by ``close`` once the session is in the
+    history. Creating a journal while one exists raises FileExistsError:
+    that session must be recovered first.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = self.path.open("x")
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        self._write({"begin": timestamp})
+        self._sync()
+        _fsync_directory(self.path)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def intend(self, steps):
+        with self._lock:
+            self._write({"intent": [[str(old), str(new)] for old, new in steps]})
+            self._sync()
+
+    def done(self, steps):
+        if steps:
+            with self._lock:
+                self._write({"done": [[str(old), str(new)] for old, new in steps]})
+
+    def exchanging(self, a, b):
+        """Record that ``a`` and ``b`` are about to be swapped, with their inodes."""
+        inodes = [os.lstat(a).st_ino, os.lstat(b).st_ino]
+        with self._lock:
+            self._write({"exchange": [str(a), str(b)], "inodes": inodes})
+            self._sync()
+
+    def exchanged(self, a, b):
+        with self._lock:
+            self._write({"exchanged": [str(a), str(b)]})
+            self._sync()
+
+    def close(self, remove=True):
+        self._file.close()
+        if remove:
+            self.path.unlink()
+
+
+def read_journal(path=JOURNAL_FILE):
+    """
+    Return ``(timestamp, steps, done, exchanges)`` from the journal at
+    ``path``, or None if there is none. ``steps`` are the intended
+    ``(old, new)`` Path pairs in order and ``done`` the set of those
+    recorded as finished. ``exchanges`` maps each swapped ``(a, b)`` pair
+    to ``(inode_a, inode_b, finished)``. A record cut short by a crash is
+    ignored.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    timestamp = None
+    steps = []
+    done = set()
+    exchanges = {}
+    with path.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if "begin" in record:
+                timestamp = record["begin"]
+            for old, new in record.get("intent", ()):
+                steps.append((Path(old), Path(new)))
+            for old, new in record.get("done", ()):
+                done.add((Path(old), Path(new)))
+            if "exchange" in record:
+                inode_a, inode_b = record["inodes"]
+                key = tuple(map(Path, record["exchange"]))
+                exchanges[key] = (inode_a, inode_b, False)
+            if "exchanged" in record:
+                key = tuple(map(Path, record["exchanged"]))
+                inode_a, inode_b, _ = exchanges.get(key, (None, None, False))
+                exchanges[key] = (inode_a, inode_b, True)
+    return timestamp, steps, done, exchanges
@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import struct
+from datetime import datetime
+
+HEADER_BYTES = 64 * 1024  # most any parser reads from one file
+
+# Tokens ``read_media_tags`` can return, with their default format spec.
+MEDIA_TOKENS = {
+    "exif_date": "%Y%m%d_%H%M%S",
+    "camera": "",
+    "width": "",
+    "height": "",
+    "artist": "",
+    "title": "",
+    "album": "",
+    "track": "",
+    "year": "",
+}
+
+_EXIF_DATE = "%Y:%m:%d %H:%M:%S"
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE}
+_ID3_FRAMES = {
+    b"TPE1": "artist",
+    b"TIT2": "title",
+    b"TALB": "album",
+    b"TRCK": "track",
+    b"TYER": "year",
+    b"TDRC": "year",
+    # ID3v2.2 uses three letter ids.
+    b"TP1": "artist",
+    b"TT2": "title",
+    b"TAL": "album",
+    b"TRK": "track",
+    b"TYE": "year",
+}
+_ID3_ENCODINGS = ("latin-1", "utf-16", "utf-16-be", "utf-8")
+
+
+def _read_jpeg(f):
+    """Walk the JPEG segment headers up to the image data, seeking past payloads."""
+    tags = {}
+    f.seek(2)
+    for _ in range(64):
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            break
+        marker = header[1]
+        length = struct.unpack(">H", header[2:])[0] - 2
+        if marker == 0xDA or length < 0:  # start of scan: pixel data follows
+            break
+        if marker == 0xE1 and "exif_date" not in tags:
+            segment = f.read(length)
+            if segment.startswith(b"Exif\0\0"):
+                tags.update(_parse_exif(segment[6:]))
+            continue
+        if marker in _JPEG_SOF:
+            sof = f.read(5)
+            if len(sof) == 5:
+                tags["height"], tags["width"] = struct.unpack(">HH", sof[1:])
+            break
+        f.seek(length, 1)
+    return tags
+
+
+def _parse_exif(data):
+    """Date and camera from a TIFF-structured EXIF block."""
+    if data[:2] == b"II":
+        order = "<"
+    elif data[:2] == b"MM":
+        order = ">"
+    else:
+        return {}
+
+    def ifd(offset):
+        entries = {}
+        if offset + 2 > len(data):
+            return entries
+        (count,) = struct.unpack_from(order + "H", data, offset)
+        for i in range(count):
+            at = offset + 2 + 12 * i
+            if at + 12 > len(data):
+                break
+            tag, kind, size = struct.unpack_from(order + "HHI", data, at)
+            if kind == 2:  # ASCII
+                start = at + 8
+                if size > 4:
+                    (start,) = struct.unpack_from(order + "I", data, at + 8)
+                value = data[start : start + size].split(b"\0", 1)[0]
+                entries[tag] = value.decode("latin-1").strip()
+            elif kind == 4:  # LONG
+                (entries[tag],) = struct.unpack_from(order + "I", data, at + 8)
+        return entries
+
+    try:
+        (offset,) = struct.unpack_from(order + "I", data, 4)
+        main = ifd(offset)
+        exif = ifd(main[0x8769]) if isinstance(main.get(0x8769), int) else {}
+    except struct.error:
+        return {}
+
+    tags = {}
+    date = exif.get(0x9003) or main.get(0x0132)  # DateTimeOriginal, DateTime
+    if isinstance(date, str):
+        try:
+            tags["exif_date"] = datetime.strptime(date, _EXIF_DATE)
+        except ValueError:
+            pass
+    model = main.get(0x0110)
+    if isinstance(model, str) and model:
+        tags["camera"] = model
+    return tags
+
+
+def _read_png(header):
+    width, height = struct.unpack(">II", header[16:24])
+    return {"width": width, "height": height}
+
+
+def _read_webp(header):
+    chunk = header[12:16]
+    if chunk == b"VP8 " and len(header) >= 30:
+        width, height = struct.unpack("<HH", header[26:30])
+        return {"width": width & 0x3FFF, "height": height & 0x3FFF}
+    if chunk == b"VP8L" and len(header) >= 25:
+        (bits,) = struct.unpack("<I", header[21:25])
+        return {"width": (bits & 0x3FFF) + 1, "height": ((bits >> 14) & 0x3FFF) + 1}
+    if chunk == b"VP8X" and len(header) >= 30:
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return {"width": width, "height": height}
+    return {}
+
+
+def _syncsafe(data):
+    return data[0] << 21 | data[1] << 14 | data[2] << 7 | data[3]
+
+
+def _read_id3(f, header):
+    version = header[3]
+    size = min(_syncsafe(header[6:10]), HEADER_BYTES)
+    data = f.read(size)
+    id_size, header_size = (3, 6) if version == 2 else (4, 10)
+    tags = {}
+    offset = 0
+    while offset + header_size <= len(data):
+        frame_id = data[offset : offset + id_size]
+        if not frame_id.strip(b"\0"):
+            break  # padding
+        raw = data[offset + id_size : offset + id_size * 2]
+        if version == 2:
+            length = int.from_bytes(raw, "big")
+        elif version == 4:
+            length = _syncsafe(raw)
+        else:
+            length = int.from_bytes(raw, "big")
+        body = data[offset + header_size : offset + header_size + length]
+        offset += header_size + length
+        name = _ID3_FRAMES.get(frame_id)
+        if name is None or not body or body[0] >= len(_ID3_ENCODINGS):
+            continue
+        text = body[1:].decode(_ID3_ENCODINGS[body[0]], "replace")
+        text = text.split("\0", 1)[0].strip()
+        if name == "track":
+            number = text.split("/", 1)[0]
+            if not number.isdigit():
+                continue
+            tags[name] = int(number)
+        elif name == "year":
+            tags[name] = text[:4]
+        elif text:
+            tags[name] = text
+    return tags
+
+
+def read_media_tags(path):
+    """
+    Read the ``MEDIA_TOKENS`` available for ``path`` from its header only:
+    EXIF date and camera model plus dimensions for JPEG, dimensions for PNG
+    and WebP, and ID3v2 text frames for audio. JPEG segments are skipped
+    with seeks and no parser reads more than ``HEADER_BYTES``. Tokens the
+    file lacks are absent from the result.
+    """
+    with open(path, "rb") as f:
+        header = f.read(32)
+        try:
+            if header[:3] == b"\xff\xd8\xff":
+                return _read_jpeg(f)
+            if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+                return _read_png(header)
+            if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+                return _read_webp(header)
+            if header[:3] == b"ID3" and len(header) >= 10:
+                f.seek(10)
+                return _read_id3(f, header)
+        except (struct.error, ValueError):
+            pass
+    return {}
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import re
+import string
+import unicodedata
+
+from .templates import suffix
+
+PROFILES = ("posix", "windows", "portable")
+UNICODE_FORMS = ("NFC", "NFD")
+MAX_NAME_BYTES = 255
+
+_WINDOWS_INVALID = '<>:"/\\|?*' + "".join(map(chr, range(32)))
+_PORTABLE_VALID = string.ascii_letters + string.digits + "._-"
+
+# Characters each profile replaces with "_".
+_POSIX_TABLE = {ord("/"): "_", 0: "_"}
+_WINDOWS_TABLE = {ord(c): "_" for c in _WINDOWS_INVALID}
+
+_RESERVED_PREFIXES = {"CON", "PRN", "AUX", "NUL", "COM", "LPT"}
+_WINDOWS_RESERVED = {"CON", "PRN", "AUX", "NUL"}
+_WINDOWS_RESERVED.update(f"COM{i}" for i in range(1, 10))
+_WINDOWS_RESERVED.update(f"LPT{i}" for i in range(1, 10))
+
+
+class _PortableTable(dict):
+    """Translate table mapping everything outside [A-Za-z0-9._-] to "_"."""
+
+    def __missing__(self, key):
+        if chr(key) in _PORTABLE_VALID:
+            raise LookupError(key)  # keep the character
+        self[key] = "_"
+        return "_"
+
+
+def _truncate(name, max_bytes):
+    """Cut ``name`` to ``max_bytes`` UTF-8 bytes, keeping its extension."""
+    ext = suffix(name)
+    stem = name[: len(name) - len(ext)]
+    ext_bytes = ext.encode("utf-8", "surrogateescape")
+    if len(ext_bytes) >= max_bytes:
+        stem, ext_bytes = name, b""
+    room = max_bytes - len(ext_bytes)
+    stem_bytes = stem.encode("utf-8", "surrogateescape")[:room]
+    # Drop a multi-byte character cut in half.
+    return stem_bytes.decode("utf-8", "ignore") + ext_bytes.decode(
+        "utf-8", "surrogateescape"
+    )
+
+
+def _fix_windows(name):
+    name = name.rstrip(". ")
+    if name[:3].upper() in _RESERVED_PREFIXES:
+        stem, dot, rest = name.partition(".")
+        if stem.rstrip(" ").upper() in _WINDOWS_RESERVED:
+            name = stem + "_" + dot + rest
+    return name
+
+
+def compile_normalizer(
+    profile="windows", unicode_form=None, max_bytes=MAX_NAME_BYTES
+):
+    """
+    Build a ``name -> name`` function that makes output names safe for
+    ``profile``.
+
+    - ``posix`` replaces "/" and NUL.
+    - ``windows`` also replaces ``<>:"\\|?*`` and control characters, strips
+      trailing dots and spaces, and suffixes reserved device names
+      (``CON.txt`` -> ``CON_.txt``).
+    - ``portable`` keeps only ``[A-Za-z0-9._-]`` plus the Windows rules.
+
+    The replacement tables are built here and applied with ``str.translate``
+    only when a single regex search finds something to replace, so clean
+    names cost one search. ``unicode_form`` ("NFC"/"NFD") normalizes names
+    that are not already in that form. Names longer than ``max_bytes``
+    UTF-8 bytes are truncated before their extension.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown normalization profile {profile!r}")
+    if unicode_form not in (None,) + UNICODE_FORMS:
+        raise ValueError(f"Unknown Unicode form {unicode_form!r}")
+
+    if profile == "posix":
+        table = _POSIX_TABLE
+        finder = re.compile("[/\0]").search
+    elif profile == "windows":
+        table = _WINDOWS_TABLE
+        finder = re.compile("[%s]" % re.escape(_WINDOWS_INVALID)).search
+    else:
+        table = _PortableTable()
+        finder = re.compile("[^%s]" % re.escape(_PORTABLE_VALID)).search
+    windows = profile != "posix"
+
+    def normalize(name):
+        if unicode_form and not unicodedata.is_normalized(unicode_form, name):
+            name = unicodedata.normalize(unicode_form, name)
+        if finder(name):
+            name = name.translate(table)
+        if max_bytes and len(name) * 4 > max_bytes:
+            # Only names that might exceed the limit pay for the encode.
+            if len(name.encode("utf-8", "surrogateescape")) > max_bytes:
+                name = _truncate(name, max_bytes)
+        if windows and (
+            name[-1:] in (".", " ") or name[:3].upper() in _RESERVED_PREFIXES
+        ):
+            name = _fix_windows(name)
+        if name in ("", ".", ".."):
+            name = name.replace(".", "_") or "_"
+        return name
+
+    return normalize
+
+
+_sanitize = compile_normalizer()
+
+
+def sanitize_filename(name: str) -> str:
+    """Make ``name`` valid on all systems (Windows in particular)."""
+    return _sanitize(name)
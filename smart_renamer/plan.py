@@ -0,0 +1,252 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import os
+import unicodedata
+from pathlib import Path
+
+from .progress import Progress
+from .templates import suffix
+
+TEMP_PREFIX = ".smart_renamer-tmp-"
+FOLD_MODES = ("report", "suffix")
+
+
+def is_temp(path):
+    """Whether ``path`` is a temporary name used to break a rename cycle."""
+    return os.path.basename(path).startswith(TEMP_PREFIX)
+
+
+def fold_key(name):
+    """
+    ``name`` as case-insensitive, normalization-insensitive clients (SMB,
+    macOS, Windows) compare it: casefolded and in NFC.
+    """
+    folded = unicodedata.normalize("NFC", name).casefold()
+    return unicodedata.normalize("NFC", folded)
+
+
+class _Listings(dict):
+    """Directory -> set of entry names, each directory listed once."""
+
+    def __init__(self):
+        super().__init__()
+        self._folded = {}
+
+    def __missing__(self, directory):
+        try:
+            names = set(os.listdir(directory))
+        except OSError:
+            names = set()
+        self[directory] = names
+        return names
+
+    def exists(self, path):
+        directory, name = os.path.split(path)
+        return name in self[directory]
+
+    def folded(self, directory):
+        """``fold_key`` -> entry name for ``directory``, built from its listing."""
+        keys = self._folded.get(directory)
+        if keys is None:
+            keys = self._folded[directory] = {
+                fold_key(name): name for name in self[directory]
+            }
+        return keys
+
+
+def _fold_collisions(moves, pairs, claims, listings, mode, report=None):
+    """
+    Find renames whose new name only differs in case or Unicode form from
+    another new name or from a file that stays. With ``mode`` "suffix" the
+    new name gets ``_2``, ``_3``... until it is free; with "report" the
+    rename is returned as ``(old, reason)`` to be skipped. Each rename
+    checked is counted on the ``report`` progress.
+    """
+    taken = {}  # (directory, fold_key) -> path claiming it
+    conflicts = []
+
+    def holder(directory, key):
+        path = taken.get((directory, key))
+        if path is not None:
+            return path
+        name = listings.folded(directory).get(key)
+        if name is not None:
+            path = os.path.join(directory, name)
+            if path not in moves:  # files being renamed away free their key
+                return path
+        return None
+
+    for source in list(moves):
+        if report is not None:
+            report.update()
+        target = moves[source]
+        directory, name = os.path.split(target)
+        key = fold_key(name)
+        other = holder(directory, key)
+        if other is None or other == target:
+            taken[(directory, key)] = target
+            continue
+        if mode == "report":
+            other = os.path.basename(other)
+            conflicts.append((source, f"{other} differs only in case or Unicode form"))
+            continue
+
+        stem = name[: len(name) - len(suffix(name))]
+        number = 2
+        while True:
+            candidate = f"{stem}_{number}{suffix(name)}"
+            key = fold_key(candidate)
+            path = os.path.join(directory, candidate)
+            if (
+                holder(directory, key) is None
+                and not listings.exists(path)
+                and path not in claims
+                and path not in moves
+            ):
+                break
+            number += 1
+        del claims[target]
+        moves[source] = path
+        claims[path] = source
+        old, new = pairs[source]
+        pairs[source] = (old, new.with_name(candidate))
+        taken[(directory, key)] = path
+    return conflicts
+
+
+def resolve_plan(changes, fold=None, progress=False):
+    """
+    Order ``changes`` (``(old, new)`` path pairs) so no rename overwrites a
+    file.
+
+    Returns ``(steps, skipped)``. ``steps`` are the pairs to rename in
+    order: a rename into a name that another file is leaving comes after
+    that file moved, so chains (``a->b, b->c``) and renumbering runs that
+    shift every ``{counter}`` by one run back to front. Cycles such as a
+    swap are broken by parking one file under a temporary name (see
+    ``is_temp`` and ``logical_changes``).
+
+    ``skipped`` lists ``(old, new, reason)`` for renames dropped because
+    another rename claimed the same new name first or the new name is taken
+    by a file that stays. Dropping one can block the rename into its name
+    in turn. Existing names are checked against one listing per target
+    directory rather than a stat per file.
+
+    ``fold`` ("report" or "suffix", see ``FOLD_MODES``) also checks new
+    names by ``fold_key`` per directory, for trees served to clients that
+    see ``Report.TXT`` and ``report.txt`` as the same file: clashing
+    renames are skipped, or get a numbered suffix.
+
+    ``progress`` reports the renames checked on stderr, in a "fold" phase
+    for ``fold`` and a "plan" phase for the existing names, since listing
+    every target directory is slow on network filesystems.
+    """
+    pairs = {}  # old -> (old, new) as given
+    moves = {}  # old -> new
+    claims = {}  # new -> old
+    skipped = []
+    for old, new in changes:
+        source, target = os.fspath(old), os.fspath(new)
+        if source == target or source in moves:
+            continue
+        if target in claims:
+            other = os.path.basename(claims[target])
+            skipped.append((old, new, f"{other} is renamed to the same name"))
+            continue
+        pairs[source] = (old, new)
+        moves[source] = target
+        claims[target] = source
+
+    listings = _Listings()
+    blocked = []
+    if fold:
+        report = Progress("fold", len(moves)) if progress else None
+        try:
+            blocked = _fold_collisions(moves, pairs, claims, listings, fold, report)
+        finally:
+            if report is not None:
+                report.close()
+        key_claims = {}
+        for source, target in moves.items():
+            directory, name = os.path.split(target)
+            key_claims.setdefault((directory, fold_key(name)), source)
+    report = Progress("plan", len(moves)) if progress else None
+    try:
+        for source, target in moves.items():
+            if report is not None:
+                report.update()
+            if target not in moves and listings.exists(target):
+                blocked.append((source, "a file with that name already exists"))
+    finally:
+        if report is not None:
+            report.close()
+    while blocked:
+        source, reason = blocked.pop()
+        if source not in moves:
+            continue
+        target = moves.pop(source)
+        del claims[target]
+        old, new = pairs.pop(source)
+        skipped.append((old, new, reason))
+        # ``source`` keeps its name, so whatever wanted it cannot move.
+        name = os.path.basename(source)
+        upstream = claims.get(source)
+        if upstream is not None:
+            blocked.append((upstream, f"{name} is not renamed"))
+        if fold:
+            directory = os.path.dirname(source)
+            upstream = key_claims.get((directory, fold_key(name)))
+            if upstream is not None and upstream != source and upstream in moves:
+                reason = f"{name} is not renamed and differs only in case"
+                blocked.append((upstream, reason))
+
+    steps = []
+    done = set()
+    for source, target in moves.items():
+        if target in moves:
+            continue
+        # End of a chain: its target is free. Walk back through the renames
+        # into each name as it is vacated.
+        while source is not None:
+            steps.append(pairs[source])
+            done.add(source)
+            source = claims.get(source)
+
+    temp_count = 0
+    for start in moves:
+        if start in done:
+            continue
+        # Every rename left is part of a cycle.
+        old, new = pairs[start]
+        directory = os.path.dirname(start)
+        while True:
+            temp_count += 1
+            temp = f"{TEMP_PREFIX}{os.getpid()}-{temp_count}"
+            temp = os.path.join(directory, temp)
+            if temp not in claims and not listings.exists(temp):
+                break
+        temp = Path(temp)
+        steps.append((old, temp))
+        done.add(start)
+        source = claims[start]
+        while source != start:
+            steps.append(pairs[source])
+            done.add(source)
+            source = claims[source]
+        steps.append((temp, new))
+    return steps, skipped
+
+
+def logical_changes(steps):
+    """
+    Yield ``steps`` with each ``old -> temp, temp -> new`` pair merged.
+    Files left under a temporary name come last, so they can be undone.
+    """
+    parked = {}
+    for old, new in steps:
+        if is_temp(new):
+            parked[new] = old
+            continue
+        yield parked.pop(old, old), new
+    for temp, old in parked.items():
+        yield old, temp
@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import sys
+import time
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds // 60 % 60:02d}m"
+
+
+class Progress:
+    """
+    Throttled progress report for one phase of a run (scan, apply, ...),
+    written to stderr so it never mixes with the preview on stdout.
+
+    Shows the count, rate, ETA when ``total`` is known, and the error count.
+    On a terminal the line is redrawn in place at most every ``interval``
+    seconds; otherwise a plain line is written every ``log_interval``
+    seconds so logs stay readable. Phases finishing within ``delay`` seconds
+    print nothing. ``update`` costs a clock read, so it can be called per
+    file.
+    """
+
+    def __init__(
+        self,
+        phase,
+        total=None,
+        unit="files",
+        hits_label=None,
+        stream=None,
+        interval=0.25,
+        log_interval=10.0,
+        delay=1.0,
+    ):
+        self.phase = phase
+        self.total = total
+        self.unit = unit
+        self.hits_label = hits_label
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty()
+        self.interval = interval if self.tty else log_interval
+        self.count = 0
+        self.hits = 0
+        self.errors = 0
+        self._start = time.monotonic()
+        self._next = self._start + delay
+        self._shown = False
+
+    def update(self, count=1):
+        self.count += count
+        now = time.monotonic()
+        if now >= self._next:
+            self._next = now + self.interval
+            self._show(self._line(now))
+
+    def _line(self, now, done=False):
+        elapsed = max(now - self._start, 1e-9)
+        rate = self.count / elapsed
+        count = f"{self.count:,}"
+        if self.total is not None:
+            count += f"/{self.total:,}"
+        parts = [f"[{self.phase}] {count} {self.unit}"]
+        if self.hits_label:
+            parts.append(f"{self.hits:,} {self.hits_label}")
+        parts.append(f"{rate:,.0f} {self.unit}/s")
+        if done:
+            parts.append(f"done in {_duration(elapsed)}")
+        elif self.total is not None and rate:
+            parts.append(f"ETA {_duration((self.total - self.count) / rate)}")
+        if self.errors:
+            parts.append(f"{self.errors:,} errors")
+        return ", ".join(parts)
+
+    def _show(self, line):
+        if self.tty:
+            self.stream.write("\r" + line + "\x1b[K")
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+        self._shown = True
+
+    def close(self):
+        """Print the final counts, if anything was shown for this phase."""
+        if not self._shown:
+            return
+        self._show(self._line(time.monotonic(), done=True))
+        if self.tty:
+            self.stream.write("\n")
+            self.stream.flush()
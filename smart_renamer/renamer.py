@@ -3,62 +3,258 @@
 #!/usr/bin/env python
 import argparse
 import json
-import re
+import multiprocessing
+import os
+import sys
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
+from .content import (
+    CONTENT_TOKENS,
+    DEFAULT_WORKERS,
+    HASH_ALGORITHMS,
+    HASH_FILE,
+    HashCache,
+    prefetch_content,
+)
+from .executor import chains, execute_plan, ran_steps
+from .guard import DEFAULT_TIMEOUT
+from .index import INDEX_FILE, ListingIndex
+from .journal import JOURNAL_FILE, Journal, read_journal
+from .normalize import (
+    MAX_NAME_BYTES,
+    PROFILES,
+    UNICODE_FORMS,
+    compile_normalizer,
+    sanitize_filename,
+)
+from .plan import FOLD_MODES, logical_changes, resolve_plan
+from .progress import Progress
+from .rules import RenameRule, RulePipeline
+from .scanner import SORT_ORDERS, STAT_ORDERS, scan_files, sort_by_stat
+from .templates import suffix
+
 LOG_FILE = ".rename_log.json"
 MAX_HISTORY = 50  # Keep only last 50 sessions
+PREVIEW_SAMPLE = 10  # changes shown with --preview-summary and no limit
 
 
-def sanitize_filename(name: str) -> str:
-    """Remove characters not allowed on all systems (Windows in particular)."""
-    return re.sub(r'[<>:"/\\|?*]', "_", name)
+def iter_rule_plan(
+    directory: Path,
+    rule,
+    recursive=False,
+    walk_workers=1,
+    exclude=None,
+    max_depth=None,
+    skip_hidden=False,
+    index=None,
+    normalize=sanitize_filename,
+    sort="name",
+    reverse=False,
+    content_workers=DEFAULT_WORKERS,
+    hash_cache=None,
+    progress=False,
+    timed_out=None,
+):
+    """
+    Yield ``(old, new)`` path pairs for every file ``rule`` renames, as the
+    directory is scanned. ``rule`` is a ``RenameRule`` or ``RulePipeline``.
+    Each new name goes through ``normalize`` (see
+    ``normalize.compile_normalizer``) once.
+
+    ``sort`` (one of ``scanner.SORT_ORDERS``) decides the order files are
+    visited and numbered in. "name" and "natural" sort each directory and
+    keep the plan streaming; "mtime", "size" and "ctime" need the whole scan
+    before the first change is produced.
+
+    ``index`` is the path of a listing index file; directories unchanged
+    since the previous run are then read from it instead of being listed.
+
+    Content tokens such as ``{sha256}`` or ``{exif_date}`` (see
+    ``content.CONTENT_TOKENS``) are computed for matching files on
+    ``content_workers`` threads ahead of the rule. ``hash_cache`` is the path
+    of a ``content.HashCache`` file reused across runs.
+
+    ``progress`` reports files scanned and matched on stderr (see
+    ``progress.Progress``).
+
+    Patterns run under the backtracking guard are reported up front. Names
+    whose matching timed out are added to the ``timed_out`` list, or
+    printed once the scan ends without one.
+    """
+    for warning in rule.risk_warnings:
+        print("⚠️ " + warning)
+    content_tokens = CONTENT_TOKENS.intersection(rule.tokens)
+    listing_index = ListingIndex(index) if index else None
+    digests = None
+    if hash_cache and content_tokens.intersection(HASH_ALGORITHMS):
+        digests = HashCache(hash_cache)
+    entries = scan_files(
+        directory,
+        recursive,
+        walk_workers,
+        exclude=exclude,
+        max_depth=max_depth,
+        skip_hidden=skip_hidden,
+        index=listing_index,
+        sort=sort,
+        reverse=reverse,
+    )
+    prefetched = None
+    report = Progress("scan", hits_label="to rename") if progress else None
+    try:
+        ordered = entries if report is None else _counted(entries, report)
+        if sort in STAT_ORDERS:
+            ordered = sort_by_stat(ordered, sort, reverse)
+        if content_tokens:
+            ordered = prefetched = prefetch_content(
+                ordered, rule.matches, content_tokens, content_workers, digests
+            )
+        for entry in ordered:
+            new_name = rule.new_name(entry.name, entry)
+            if new_name is None:
+                continue
+            file = Path(entry.path)
+            if report is not None:
+                report.hits += 1
+            yield file, file.with_name(normalize(new_name))
+
+        if timed_out is None:
+            _report_timeouts(rule.timed_out)
+        else:
+            timed_out.extend(rule.timed_out)
+    finally:
+        if report is not None:
+            report.close()
+        if prefetched is not None:
+            prefetched.close()  # waits for running hashes before the cache closes
+        entries.close()
+        rule.close()
+        if listing_index is not None:
+            listing_index.close()
+        if digests is not None:
+            digests.close()
+
+
+def _report_timeouts(names):
+    if not names:
+        return
+    print(f"⚠️ Matching timed out on {len(names)} files, they are left unchanged:")
+    for name in names[:10]:
+        print("   " + name)
+    if len(names) > 10:
+        print("   ...")
 
 
-def rename_files(
+def _counted(items, report):
+    for item in items:
+        report.update()
+        yield item
+
+
+def iter_rename_plan(
     directory: Path,
     match_pattern: str,
     replace_pattern: str,
     mode="pattern",
     start=1,
     recursive=False,
+    walk_workers=1,
+    match_glob=None,
+    exclude=None,
+    max_depth=None,
+    skip_hidden=False,
+    index=None,
+    regex_timeout=DEFAULT_TIMEOUT,
+    normalize=sanitize_filename,
+    sort="name",
+    reverse=False,
+    content_workers=DEFAULT_WORKERS,
+    hash_cache=None,
+    progress=False,
+    timed_out=None,
 ):
     """
-    Unified rename function for pattern and increment modes.
-    """
-    regex = re.compile(match_pattern)
-    files = sorted(directory.rglob("*") if recursive else directory.iterdir())
-    counter = start
-    changes = []
-
-    for file in files:
-        if not file.is_file():
-            continue
+    Yield ``(old, new)`` path pairs for pattern and increment modes as the
+    directory is scanned, without holding the whole plan in memory.
 
-        match = regex.search(file.name)
-        if not match:
-            continue
-
-        ext = file.suffix  # preserve original extension
-        if mode == "increment":
-            try:
-                base_name = replace_pattern.format(counter=counter, **match.groupdict())
-            except (IndexError, KeyError):
-                base_name = replace_pattern.format(counter=counter)
-            counter += 1
-        else:  # pattern mode
-            base_name = regex.sub(replace_pattern, file.name)
-            # always append original extension if not included
-            if not base_name.endswith(ext):
-                base_name += ext
-            ext = ""
+    ``match_glob`` (ie. ``*.txt``) is checked before ``match_pattern`` so
+    files it excludes never reach the regex. Names lacking a literal that
+    ``match_pattern`` requires are rejected the same way. Patterns prone to
+    catastrophic backtracking run with ``regex_timeout`` seconds per file.
+    """
+    rule = RenameRule(
+        match_pattern, replace_pattern, mode, start, match_glob, regex_timeout
+    )
+    yield from iter_rule_plan(
+        directory,
+        rule,
+        recursive,
+        walk_workers,
+        exclude,
+        max_depth,
+        skip_hidden,
+        index,
+        normalize,
+        sort,
+        reverse,
+        content_workers,
+        hash_cache,
+        progress,
+        timed_out,
+    )
 
-        new_name = sanitize_filename(base_name + ext)
-        new_path = file.with_name(new_name)
-        changes.append((file, new_path))
 
-    return changes
+def rename_files(
+    directory: Path,
+    match_pattern: str,
+    replace_pattern: str,
+    mode="pattern",
+    start=1,
+    recursive=False,
+    walk_workers=1,
+    match_glob=None,
+    exclude=None,
+    max_depth=None,
+    skip_hidden=False,
+    index=None,
+    regex_timeout=DEFAULT_TIMEOUT,
+    normalize=sanitize_filename,
+    sort="name",
+    reverse=False,
+    content_workers=DEFAULT_WORKERS,
+    hash_cache=None,
+    progress=False,
+    timed_out=None,
+):
+    """
+    Unified rename function for pattern and increment modes.
+    """
+    return list(
+        iter_rename_plan(
+            directory,
+            match_pattern,
+            replace_pattern,
+            mode,
+            start,
+            recursive,
+            walk_workers,
+            match_glob,
+            exclude,
+            max_depth,
+            skip_hidden,
+            index,
+            regex_timeout,
+            normalize,
+            sort,
+            reverse,
+            content_workers,
+            hash_cache,
+            progress,
+            timed_out,
+        )
+    )
 
 
 def load_history():
@@ -73,27 +269,160 @@ def save_history(history):
 
 
 def add_to_history(changes):
-    history = load_history()
-    session = {
-        "timestamp": datetime.now().isoformat(timespec="seconds"),
-        "changes": [{"old": str(old), "new": str(new)} for old, new in changes],
-    }
-    history.append(session)
-    history = history[-MAX_HISTORY:]  # keep last N sessions
-    save_history(history)
-    print(f"📒 Logged {len(changes)} renames at {session['timestamp']}")
+    """
+    Log ``changes`` as a new session.
+
+    ``changes`` is consumed once and streamed into the log file, so it can be
+    a generator of any size.
+    """
+    history = load_history()[-(MAX_HISTORY - 1) :]  # keep last N sessions
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    path = Path(LOG_FILE)
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+    with tmp_path.open("w") as f:
+        f.write("[\n")
+        for session in history:
+            f.write(json.dumps(session, indent=2) + ",\n")
+        f.write('{\n  "timestamp": %s,\n  "changes": [' % json.dumps(timestamp))
+        for old, new in changes:
+            f.write(",\n    " if count else "\n    ")
+            f.write(json.dumps({"old": str(old), "new": str(new)}))
+            count += 1
+        f.write("\n  ]\n}\n]")
+    os.replace(tmp_path, path)
+    print(f"📒 Logged {count} renames at {timestamp}")
+
+
+def _preview(changes, limit=None, summary=False, out=None, skipped=()):
+    """
+    Print the ``changes`` about to be made.
+
+    At most ``limit`` changes are shown (a sample of ``PREVIEW_SAMPLE``
+    with ``summary`` when no limit is given), and ``out`` receives all of
+    them with full paths. Lines are buffered and written in bulk. With
+    ``summary`` the counts per directory and extension follow, plus the
+    number of ``skipped`` collisions.
+    """
+    if summary and limit is None:
+        limit = PREVIEW_SAMPLE
+    shown = changes if limit is None else changes[:limit]
+    lines = [f"  {old.name} -> {new.name}\n" for old, new in shown]
+    if len(changes) > len(shown):
+        lines.append(f"  ... and {len(changes) - len(shown):,} more\n")
+    sys.stdout.write("".join(lines))
+
+    if out:
+        with open(out, "w", encoding="utf-8", buffering=1 << 20) as f:
+            f.writelines(f"{old} -> {new}\n" for old, new in changes)
+        print(f"📄 Full preview written to {out}")
+    if not summary:
+        return
+    by_directory = Counter(os.path.dirname(old) for old, _ in changes)
+    by_extension = Counter(suffix(new.name) or "(none)" for _, new in changes)
+    print(f"\n📊 {len(changes):,} renames in {len(by_directory):,} directories")
+    print(f"   {len(skipped):,} skipped as collisions")
+    for title, counts in (("directory", by_directory), ("extension", by_extension)):
+        print(f"   By {title}:")
+        for key, count in counts.most_common(10):
+            print(f"     {count:>10,}  {key}")
+        if len(counts) > 10:
+            print(f"     ... {len(counts) - 10:,} more")
+
+
+def _track(applied, report, failures):
+    """Count ``applied`` steps and ``failures`` on ``report`` as they come."""
+    failed = 0
+    for step in applied:
+        if len(failures) != failed:
+            report.errors = len(failures)
+            report.update(len(failures) - failed)
+            failed = len(failures)
+        report.update()
+        yield step
+    report.errors = len(failures)
+    report.close()
+
+
+def _report_skipped(skipped):
+    if not skipped:
+        return
+    print(f"⚠️ Skipping {len(skipped)} renames that would overwrite files:")
+    for old, new, reason in skipped[:10]:
+        print(f"   {old.name} -> {new.name} ({reason})")
+    if len(skipped) > 10:
+        print("   ...")
+
+
+def _report_failures(failures, report_path=None):
+    """Summarize ``executor.Failure`` records and optionally save them as JSON."""
+    if not failures:
+        return
+    print(f"❌ {len(failures)} renames failed:")
+    for failure in failures[:10]:
+        print(f"   {failure.old} -> {failure.new.name}: {failure.reason}")
+    if len(failures) > 10:
+        print("   ...")
+    if report_path:
+        records = [
+            {"old": str(f.old), "new": str(f.new), "reason": f.reason}
+            for f in failures
+        ]
+        Path(report_path).write_text(json.dumps(records, indent=2))
+        print(f"📒 Failure report written to {report_path}")
 
 
 def confirm_and_apply(
-    changes, dry_run=False, auto_confirm=False, save_history_flag=True
+    changes,
+    dry_run=False,
+    auto_confirm=False,
+    save_history_flag=True,
+    fold_collisions=None,
+    workers=1,
+    per_directory=False,
+    failure_report=None,
+    progress=False,
+    preview_limit=None,
+    preview_summary=False,
+    preview_out=None,
+    timed_out=None,
 ):
+    """
+    Preview ``changes`` and apply them.
+
+    ``changes`` can be a list or a lazy iterable such as ``iter_rename_plan``.
+    Before anything is renamed the plan goes through ``plan.resolve_plan``,
+    which needs all of it: renames are ordered so chains, swaps and shifted
+    numbering never overwrite a file, and renames onto a name that stays
+    taken are skipped. ``fold_collisions`` ("report" or "suffix") also
+    catches names that only differ in case or Unicode form. ``dry_run``
+    goes through the same checks, so it shows what a real run would do.
+
+    Renames run on ``workers`` threads (see ``executor.execute_plan``).
+    Failures are summarized at the end, written to ``failure_report`` as
+    JSON if given, and returned as a list of ``executor.Failure``.
+
+    Renames are recorded in a write-ahead ``journal.Journal`` until the
+    session is in the history, so a run killed halfway can be completed or
+    rolled back with ``recover``. ``progress`` reports checking the plan
+    and the renames on stderr with rate and ETA.
+
+    ``preview_limit``, ``preview_summary`` and ``preview_out`` bound the
+    preview for huge plans, see ``_preview``. Names in ``timed_out`` (see
+    ``iter_rule_plan``) are reported after it.
+    """
+    steps, skipped = resolve_plan(changes, fold_collisions, progress)
+    _report_skipped(skipped)
+    changes = list(logical_changes(steps))
+
     if not changes:
+        _report_timeouts(timed_out)
         print("⚠️ No matching files found.")
         return
 
     print(f"\nPreview: {len(changes)} files will be renamed:")
-    for old, new in changes:
-        print(f"  {old.name} -> {new.name}")
+    _preview(changes, preview_limit, preview_summary, preview_out, skipped)
+    _report_timeouts(timed_out)
 
     if dry_run:
         print("\n💡 Dry run mode enabled. No files will be renamed.")
@@ -105,16 +434,29 @@ def confirm_and_apply(
             print("❌ Operation cancelled.")
             return
 
-    for old, new in changes:
-        try:
-            old.rename(new)
-        except Exception as e:
-            print(f"❌ Failed to rename {old} -> {new}: {e}")
+    try:
+        journal = Journal()
+    except FileExistsError:
+        print(
+            f"❌ An interrupted session was found in {JOURNAL_FILE}. "
+            "Run 'recover' to complete or roll it back first."
+        )
+        return
+    failures = []
+    applied = execute_plan(steps, workers, per_directory, failures, journal)
+    if progress:
+        applied = _track(applied, Progress("apply", len(steps)), failures)
+    applied = logical_changes(applied)
+    if save_history_flag:
+        add_to_history(applied)
+    else:
+        for _ in applied:
+            pass
+    journal.close()
 
+    _report_failures(failures, failure_report)
     print("✅ Renaming complete.")
-
-    if save_history_flag:
-        add_to_history(changes)
+    return failures
 
 
 def undo_last(dry_run=False, auto_confirm=False):
@@ -158,16 +500,97 @@ def undo_last(dry_run=False, auto_confirm=False):
             print("❌ Undo cancelled.")
             return
 
-    for old, new in changes:
-        try:
-            old.rename(new)
-        except Exception as e:
-            print(f"❌ Failed to rename {old} -> {new}: {e}")
+    steps, skipped = resolve_plan(changes)
+    _report_skipped(skipped)
+    failures = []
+    for _ in execute_plan(steps, failures=failures):
+        pass
+    _report_failures(failures)
 
     save_history(history)
     print("✅ Undo complete.")
 
 
+def recover(rollback=False, dry_run=False, auto_confirm=False, progress=False):
+    """
+    Finish a session interrupted before it reached the history, from its
+    journal.
+
+    Which renames were applied is worked out per chain by
+    ``executor.ran_steps``. By default the remaining renames are run and
+    the session is logged so ``--undo`` can revert it; with ``rollback``
+    the applied ones are reverted instead.
+    """
+    found = read_journal()
+    if found is None:
+        print("⚠️ No interrupted session found. Nothing to recover.")
+        return
+    timestamp, steps, done, exchanges = found
+
+    applied = []
+    pending = []
+    for steps_in_order in chains(steps):
+        ran = ran_steps(steps_in_order, done, exchanges)
+        applied += steps_in_order[:ran]
+        pending += steps_in_order[ran:]
+
+    print(
+        f"\nInterrupted session from {timestamp}: "
+        f"{len(applied)} renames applied, {len(pending)} pending."
+    )
+    if rollback:
+        todo = [(new, old) for old, new in reversed(applied)]
+        action = "Roll back"
+    else:
+        todo = pending
+        action = "Complete"
+    for old, new in list(logical_changes(todo))[:10]:
+        print(f"  {old.name} -> {new.name}")
+    if len(todo) > 10:
+        print("  ...")
+
+    if dry_run:
+        print("\n💡 Dry run mode enabled. No files will be renamed.")
+        return
+    if not auto_confirm:
+        confirm = input(f"\n{action} this session? (y/N): ").strip().lower()
+        if confirm != "y":
+            print("❌ Recovery cancelled.")
+            return
+
+    failures = []
+    finished = execute_plan(todo, failures=failures)
+    if progress:
+        finished = _track(finished, Progress("recover", len(todo)), failures)
+    finished = list(finished)
+    if not rollback:
+        add_to_history(logical_changes(applied + finished))
+    Path(JOURNAL_FILE).unlink()
+    _report_failures(failures)
+    print("✅ Recovery complete.")
+
+
+def recover_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="smart_renamer recover",
+        description="Complete or roll back a rename session that was interrupted.",
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Revert the renames already applied instead of finishing the rest",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Show what would be done only"
+    )
+    parser.add_argument("--yes", action="store_true", help="Skip confirmation")
+    parser.add_argument(
+        "--no-progress", action="store_true", help="Don't report progress on stderr"
+    )
+    args = parser.parse_args(argv)
+    recover(args.rollback, args.dry_run, args.yes, not args.no_progress)
+
+
 def show_history():
     history = load_history()
     if not history:
@@ -183,6 +606,13 @@ def show_history():
             print("   ...")
 
 
+def _cache_path(value, default):
+    """Map a config ``index``/``hash_cache`` value (true or a path) to a file."""
+    if value is True:
+        return default
+    return value or None
+
+
 def apply_from_config(file_path):
     """Load arguments from JSON config file and run renaming."""
     config = json.loads(Path(file_path).read_text())
@@ -191,25 +621,75 @@ def apply_from_config(file_path):
         print(f"❌ Error: {directory} is not a valid directory.")
         return
 
-    changes = rename_files(
+    regex_timeout = config.get("regex_timeout", DEFAULT_TIMEOUT)
+    if "rules" in config:
+        # Ordered rules evaluated in one scan, logged as one session.
+        rule = RulePipeline.from_config(
+            config["rules"], config.get("rule_mode", "first"), regex_timeout
+        )
+    else:
+        rule = RenameRule(
+            config.get("match_pattern"),
+            config.get("replace_pattern"),
+            config.get("mode", "pattern"),
+            config.get("start", 1),
+            config.get("match_glob"),
+            regex_timeout,
+        )
+    timed_out = []
+    changes = iter_rule_plan(
         directory,
-        config.get("match_pattern"),
-        config.get("replace_pattern"),
-        config.get("mode", "pattern"),
-        config.get("start", 1),
+        rule,
         config.get("recursive", False),
+        config.get("walk_workers", 1),
+        config.get("exclude"),
+        config.get("max_depth"),
+        config.get("skip_hidden", False),
+        _cache_path(config.get("index"), INDEX_FILE),
+        compile_normalizer(
+            config.get("normalize", "windows"),
+            config.get("unicode_form"),
+            config.get("max_name_bytes", MAX_NAME_BYTES),
+        ),
+        config.get("sort", "name"),
+        config.get("reverse", False),
+        config.get("content_workers", DEFAULT_WORKERS),
+        _cache_path(config.get("hash_cache"), HASH_FILE),
+        config.get("progress", True),
+        timed_out,
     )
 
     confirm_and_apply(
         changes,
         dry_run=config.get("dry_run", False),
         auto_confirm=config.get("yes", False),
+        fold_collisions=config.get("fold_collisions"),
+        workers=config.get("rename_workers", 1),
+        per_directory=config.get("per_directory", False),
+        failure_report=config.get("failure_report"),
+        progress=config.get("progress", True),
+        preview_limit=config.get("preview_limit"),
+        preview_summary=config.get("preview_summary", False),
+        preview_out=config.get("preview_out"),
+        timed_out=timed_out,
     )
 
 
 def main():
+    multiprocessing.freeze_support()  # guard workers in frozen builds
+    if sys.argv[1:2] == ["watch"]:
+        from . import watch
+
+        watch.main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["recover"]:
+        recover_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
-        description="Cross-platform file renamer with regex, increment, undo, and history."
+        description="Cross-platform file renamer with regex, increment, undo, and history.",
+        epilog="Run 'watch --help' to rename new files as they arrive, or"
+        " 'recover --help' to finish a session that was interrupted.",
     )
     parser.add_argument("directory", nargs="?", help="Directory containing files")
     parser.add_argument(
@@ -224,7 +704,10 @@ def main():
         "--mode",
         choices=["pattern", "increment"],
         default="pattern",
-        help="Rename mode defaults to pattern\nCan also use named groups in increment",
+        help="Rename mode defaults to pattern\nCan also use named groups in increment"
+        " and file metadata: {mtime:%%Y%%m%%d}, {ctime}, {size}, {inode},"
+        " {sha256:12}, {ext}, {exif_date}, {camera}, {width}, {height},"
+        " {artist}, {title}, {album}, {track}, {year}",
     )
     parser.add_argument(
         "--start", type=int, default=1, help="Starting number for increment mode"
@@ -234,6 +717,120 @@ def main():
         action="store_true",
         help="Process files in subdirectories recursively",
     )
+    parser.add_argument(
+        "--walk-workers",
+        type=int,
+        default=1,
+        help="Number of threads listing subdirectories in recursive mode",
+    )
+    parser.add_argument(
+        "--match-glob",
+        help="Glob files must match before the regex is tried, ie. *.txt",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        help="Glob of file or directory names to skip, ie. node_modules (repeatable)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="Maximum subdirectory depth in recursive mode (0 = top level only)",
+    )
+    parser.add_argument(
+        "--skip-hidden",
+        action="store_true",
+        help="Skip files and directories whose name starts with a dot",
+    )
+    parser.add_argument(
+        "--index",
+        nargs="?",
+        const=INDEX_FILE,
+        help=f"Cache directory listings in an index file (default {INDEX_FILE})",
+    )
+    parser.add_argument(
+        "--regex-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds per file for patterns prone to catastrophic backtracking (0 = off)",
+    )
+    parser.add_argument(
+        "--normalize",
+        choices=PROFILES,
+        default="windows",
+        help="Filename rules new names must satisfy (defaults to windows)",
+    )
+    parser.add_argument(
+        "--unicode-form",
+        choices=UNICODE_FORMS,
+        help="Unicode normalization applied to new names",
+    )
+    parser.add_argument(
+        "--max-name-bytes",
+        type=int,
+        default=MAX_NAME_BYTES,
+        help="Truncate new names to this many UTF-8 bytes, keeping the extension",
+    )
+    parser.add_argument(
+        "--sort",
+        choices=SORT_ORDERS,
+        default="name",
+        help="Order files are numbered in for increment mode (defaults to name)",
+    )
+    parser.add_argument(
+        "--reverse", action="store_true", help="Reverse the --sort order"
+    )
+    parser.add_argument(
+        "--content-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Threads reading files for content tokens like {sha256} or {exif_date}",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        nargs="?",
+        const=HASH_FILE,
+        help=f"Reuse file hashes across runs via a cache file (default {HASH_FILE})",
+    )
+    parser.add_argument(
+        "--fold-collisions",
+        choices=FOLD_MODES,
+        help="Also treat names differing only in case or Unicode form as"
+        " collisions: skip them (report) or add a number (suffix)",
+    )
+    parser.add_argument(
+        "--rename-workers",
+        type=int,
+        default=1,
+        help="Number of threads renaming files (helps on network filesystems)",
+    )
+    parser.add_argument(
+        "--per-directory",
+        action="store_true",
+        help="With --rename-workers, rename one file at a time per directory",
+    )
+    parser.add_argument(
+        "--failure-report",
+        help="Write failed renames to this JSON file",
+    )
+    parser.add_argument(
+        "--preview-limit",
+        type=int,
+        help="Show at most this many changes in the preview",
+    )
+    parser.add_argument(
+        "--preview-summary",
+        action="store_true",
+        help="Show counts per directory and extension and a sample of changes",
+    )
+    parser.add_argument(
+        "--preview-out", help="Write the full preview to this file"
+    )
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="Don't report scan, plan and rename progress on stderr",
+    )
     parser.add_argument(
         "--dry-run", action="store_true", help="Show preview only, don’t rename"
     )
@@ -269,16 +866,44 @@ def main():
         print(f"❌ Error: {directory} is not a valid directory.")
         return
 
-    changes = rename_files(
+    timed_out = []
+    changes = iter_rename_plan(
         directory,
         args.match_pattern,
         args.replace_pattern,
         args.mode,
         args.start,
         args.recursive,
+        args.walk_workers,
+        args.match_glob,
+        args.exclude,
+        args.max_depth,
+        args.skip_hidden,
+        args.index,
+        args.regex_timeout,
+        compile_normalizer(args.normalize, args.unicode_form, args.max_name_bytes),
+        args.sort,
+        args.reverse,
+        args.content_workers,
+        args.hash_cache,
+        not args.no_progress,
+        timed_out,
     )
 
-    confirm_and_apply(changes, args.dry_run, args.yes)
+    confirm_and_apply(
+        changes,
+        args.dry_run,
+        args.yes,
+        fold_collisions=args.fold_collisions,
+        workers=args.rename_workers,
+        per_directory=args.per_directory,
+        failure_report=args.failure_report,
+        progress=not args.no_progress,
+        preview_limit=args.preview_limit,
+        preview_summary=args.preview_summary,
+        preview_out=args.preview_out,
+        timed_out=timed_out,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,272 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import re
+
+from .filters import (
+    compile_glob,
+    compile_literal_filter,
+    has_backreferences,
+    required_literals,
+)
+from .guard import DEFAULT_TIMEOUT, RegexWorker, SpanMatch, find_catastrophic
+from .templates import compile_format_template, compile_sub_template, suffix
+
+
+class RenameRule:
+    """
+    A compiled match/replace rule for pattern or increment mode.
+
+    The increment counter lives on the rule, so the same rule can be fed
+    names from one scan or from many batches (see ``watch``) and keeps
+    numbering where it left off. New names are returned as produced by the
+    template; callers pass them through ``normalize`` once per output name.
+
+    Patterns that ``guard.find_catastrophic`` flags are matched in a worker
+    process with a budget of ``timeout`` seconds per file (0 disables the
+    guard). Only the regex runs there; templates are rendered here with the
+    prefetched ``entry``. ``risk`` names the construct ``find_catastrophic``
+    found and ``risk_warnings`` describes the guard for the caller to show.
+    Names that run out of time are collected in ``timed_out`` and treated
+    as not matching.
+    """
+
+    def __init__(
+        self,
+        match_pattern,
+        replace_pattern,
+        mode="pattern",
+        start=1,
+        match_glob=None,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.regex = re.compile(match_pattern)
+        self.replace_pattern = replace_pattern
+        self.mode = mode
+        self.counter = start
+        self._glob = compile_glob(match_glob) if match_glob else None
+        self._literal_filter = compile_literal_filter(self.regex)
+        literals = required_literals(self.regex)
+        self.prefix = literals[0] if literals else ""
+        if mode == "increment":
+            self._render = compile_format_template(self.regex, replace_pattern)
+            # Template tokens used, e.g. for ``content.prefetch_content``.
+            self.tokens = self._render.tokens
+        else:
+            self._expand = compile_sub_template(self.regex, replace_pattern)
+            self.tokens = frozenset()
+
+        self.risk = find_catastrophic(self.regex)
+        self.timed_out = []
+        self._worker = None
+        if self.risk and timeout:
+            args = (match_pattern, replace_pattern, mode, start, match_glob, 0)
+            self._worker = RegexWorker(RenameRule, args, timeout)
+
+    @property
+    def risk_warnings(self):
+        """Why this rule is matched under the guard, for callers to report."""
+        if self._worker is None:
+            return []
+        return [
+            f"Pattern {self.regex.pattern!r} may backtrack catastrophically "
+            f"({self.risk}); matching with a {self._worker.timeout}s limit per file."
+        ]
+
+    def new_name(self, name, entry=None):
+        """
+        Return the new filename for ``name``, or None if the rule does not
+        match. ``entry`` is the file's ``os.DirEntry``, needed when the
+        template uses metadata tokens such as ``{mtime}``.
+        """
+        if self._glob is not None and not self._glob(name):
+            return None
+        if self._literal_filter is not None and not self._literal_filter(name):
+            return None
+        if self._worker is None:
+            return self.transform(name, entry)
+
+        try:
+            result = self._worker.call(name)
+        except TimeoutError:
+            self.timed_out.append(name)
+            return None
+        if result is None:
+            return None
+        if self.mode == "increment":
+            return self._render_name(name, SpanMatch(self.regex, name, result), entry)
+        return self._pattern_name(name, result)
+
+    def matches(self, name):
+        """
+        Whether ``new_name`` may rename ``name``. Guarded patterns are not run
+        here and always count as a possible match.
+        """
+        if self._glob is not None and not self._glob(name):
+            return False
+        if self._literal_filter is not None and not self._literal_filter(name):
+            return False
+        return self._worker is not None or self.regex.search(name) is not None
+
+    def transform(self, name, entry=None):
+        """Run the regex and template on ``name``, without the prefilters."""
+        match = self.regex.search(name)
+        if not match:
+            return None
+        if self.mode == "increment":
+            return self._render_name(name, match, entry)
+        return self._pattern_name(name, self.regex.sub(self._expand, name))
+
+    def guarded_match(self, name):
+        """
+        The regex part of ``transform``, run by the guard worker: the spans
+        of every group of the first match in increment mode, the substituted
+        name in pattern mode, or None without a match. Templates with
+        metadata or content tokens are rendered by the caller.
+        """
+        match = self.regex.search(name)
+        if not match:
+            return None
+        if self.mode == "increment":
+            return [match.span(i) for i in range(self.regex.groups + 1)]
+        return self.regex.sub(self._expand, name)
+
+    def _render_name(self, name, match, entry):
+        base_name = self._render(self.counter, match, entry)
+        self.counter += 1
+        if "ext" in self.tokens:
+            return base_name  # placed by the template
+        return base_name + suffix(name)  # preserve original extension
+
+    @staticmethod
+    def _pattern_name(name, base_name):
+        # always append original extension if not included
+        ext = suffix(name)
+        if not base_name.endswith(ext):
+            base_name += ext
+        return base_name
+
+    def close(self):
+        """Stop the guard worker, if any."""
+        if self._worker is not None:
+            self._worker.close()
+
+
+def _combine(rules):
+    """
+    Join the rules' regexes into one alternation that matches a name if and
+    only if at least one of them does, so names no rule wants cost one search.
+    Returns its ``search`` method, or ``None`` when the patterns cannot be
+    combined safely (global flags, backreferences, clashing group names or
+    a pattern that needs the backtracking guard).
+    """
+    patterns = []
+    for rule in rules:
+        regex = rule.regex
+        if rule.risk or regex.flags & ~re.UNICODE or has_backreferences(regex):
+            return None
+        patterns.append("(?:%s)" % regex.pattern)
+    if len(patterns) < 2:
+        return None
+    try:
+        return re.compile("|".join(patterns)).search
+    except re.error:
+        return None
+
+
+class RulePipeline:
+    """
+    Several rules applied to each name in a single pass.
+
+    With ``chain`` False the first rule that matches decides the new name.
+    With ``chain`` True every rule sees the output of the previous one and
+    the name changes if any of them matched. Exposes the same ``new_name``
+    as ``RenameRule`` so it can be planned the same way.
+    """
+
+    def __init__(self, rules, chain=False):
+        self.rules = list(rules)
+        self.chain = chain
+        self._any_match = _combine(self.rules)
+        # Rules with an anchored literal prefix are only tried on names
+        # starting with it: {prefix length: {prefix: [rule indices]}}.
+        self._by_prefix = {}
+        self._unanchored = []
+        for i, rule in enumerate(self.rules):
+            if rule.prefix:
+                table = self._by_prefix.setdefault(len(rule.prefix), {})
+                table.setdefault(rule.prefix, []).append(i)
+            else:
+                self._unanchored.append(i)
+
+    @property
+    def tokens(self):
+        return frozenset().union(*(rule.tokens for rule in self.rules))
+
+    @property
+    def timed_out(self):
+        return [name for rule in self.rules for name in rule.timed_out]
+
+    @property
+    def risk_warnings(self):
+        return [warning for rule in self.rules for warning in rule.risk_warnings]
+
+    def close(self):
+        for rule in self.rules:
+            rule.close()
+
+    @classmethod
+    def from_config(cls, rules, rule_mode="first", timeout=DEFAULT_TIMEOUT):
+        """Build a pipeline from the ``rules`` list of a JSON config."""
+        if rule_mode not in ("first", "chain"):
+            raise ValueError(f"Unknown rule_mode {rule_mode!r}")
+        return cls(
+            (
+                RenameRule(
+                    rule["match_pattern"],
+                    rule["replace_pattern"],
+                    rule.get("mode", "pattern"),
+                    rule.get("start", 1),
+                    rule.get("match_glob"),
+                    timeout,
+                )
+                for rule in rules
+            ),
+            chain=rule_mode == "chain",
+        )
+
+    def _candidates(self, name):
+        """Indices, in rule order, of the rules that can possibly match ``name``."""
+        found = self._unanchored
+        for length, table in self._by_prefix.items():
+            hits = table.get(name[:length])
+            if hits:
+                found = found + hits
+        if found is self._unanchored:
+            return found
+        return sorted(found)
+
+    def matches(self, name):
+        if self._any_match is not None:
+            return self._any_match(name) is not None
+        return any(self.rules[i].matches(name) for i in self._candidates(name))
+
+    def new_name(self, name, entry=None):
+        # If no rule matches the original name, none matches in chain mode
+        # either, since the name is only rewritten after a match.
+        if self._any_match is not None and self._any_match(name) is None:
+            return None
+
+        if not self.chain:
+            for i in self._candidates(name):
+                new_name = self.rules[i].new_name(name, entry)
+                if new_name is not None:
+                    return new_name
+            return None
+
+        matched = False
+        for rule in self.rules:
+            new_name = rule.new_name(name, entry)
+            if new_name is not None:
+                name = new_name
+                matched = True
+        return name if matched else None
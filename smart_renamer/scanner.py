@@ -0,0 +1,187 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .filters import compile_globs
+
+SORT_ORDERS = ("name", "natural", "mtime", "size", "ctime")
+# Orders that need file metadata and are applied across the whole scan.
+STAT_ORDERS = {
+    "mtime": lambda st: st.st_mtime_ns,
+    "size": lambda st: st.st_size,
+    "ctime": lambda st: st.st_ctime_ns,
+}
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _sort_key(entry):
+    # Path comparison is case-insensitive on Windows, normcase mirrors that.
+    return os.path.normcase(entry.name)
+
+
+def natural_key(entry):
+    """Sort key ordering ``img2`` before ``img10``."""
+    name = os.path.normcase(entry.name)
+    parts = _DIGITS.split(name)
+    parts[1::2] = map(int, parts[1::2])
+    return parts, name
+
+
+def list_dir(path):
+    """Return the entries of ``path`` sorted the same way ``Path`` objects sort."""
+    with os.scandir(path) as it:
+        entries = list(it)
+    entries.sort(key=_sort_key)
+    return entries
+
+
+def _is_subdir(entry):
+    try:
+        return entry.is_dir(follow_symlinks=False)
+    except OSError:
+        return False
+
+
+def _is_file(entry):
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+def scan_files(
+    directory,
+    recursive=False,
+    workers=1,
+    exclude=None,
+    max_depth=None,
+    skip_hidden=False,
+    index=None,
+    sort="name",
+    reverse=False,
+):
+    """
+    Lazily yield ``os.DirEntry`` objects for the files in ``directory``.
+
+    Entries are sorted per directory and subdirectories are descended in
+    place, which gives the same order as ``sorted(directory.rglob("*"))``
+    without listing the whole tree up front. File checks use the d_type
+    cached by ``os.scandir`` so no extra stat is needed per entry.
+
+    With ``workers`` > 1 in recursive mode, the subdirectories the walk will
+    reach next are listed ahead of time on a thread pool of that size, at
+    most ``workers * 4`` at a time so memory stays bounded. Results are
+    still consumed in walk order, so the output is identical to the serial
+    walk.
+
+    Entries whose name matches one of the ``exclude`` globs, or starts with a
+    dot when ``skip_hidden`` is set, are skipped; for directories this
+    happens before they are listed. ``max_depth`` limits how many levels of
+    subdirectories are descended (0 scans ``directory`` only).
+
+    ``index`` is an optional ``index.ListingIndex`` used in place of
+    ``os.scandir`` for directories that have not changed since the last run.
+
+    ``sort`` "natural" orders each directory with ``natural_key`` instead of
+    plain name order, and ``reverse`` flips each directory's order. Metadata
+    orders are applied over the whole scan by ``sort_by_stat``.
+    """
+    lister = index.list_dir if index is not None else list_dir
+    if sort not in STAT_ORDERS and (sort == "natural" or reverse):
+        key = natural_key if sort == "natural" else _sort_key
+        base_lister = lister
+
+        def lister(path):
+            entries = base_lister(path)
+            entries.sort(key=key, reverse=reverse)
+            return entries
+
+    pool = None
+    if recursive and workers > 1:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    window = workers * 4
+    pending = {}  # path -> future of its listing
+    # Subdirectories found but not yet submitted; the last one inserted is
+    # the next the depth-first walk reaches.
+    wanted = {}
+    excluded = compile_globs(exclude) if exclude else None
+    prune = excluded is not None or skip_hidden
+
+    def pruned(entry):
+        name = entry.name
+        if skip_hidden and name.startswith("."):
+            return True
+        return excluded is not None and excluded(name)
+
+    def descends(entry, depth):
+        return (
+            recursive
+            and (max_depth is None or depth <= max_depth)
+            and _is_subdir(entry)
+            and not (prune and pruned(entry))
+        )
+
+    def prefetch():
+        while wanted and len(pending) < window:
+            path, _ = wanted.popitem()
+            pending[path] = pool.submit(lister, path)
+
+    def descend(entries, depth):
+        if pool is not None:
+            for entry in reversed(entries):
+                if descends(entry, depth):
+                    wanted[entry.path] = None
+            prefetch()
+        return iter(entries)
+
+    def listing(path):
+        future = pending.pop(path, None)
+        if future is None:
+            wanted.pop(path, None)
+            return lister(path)
+        prefetch()
+        return future.result()
+
+    try:
+        stack = [descend(lister(directory), 1)]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+            depth = len(stack)
+            if descends(entry, depth):
+                try:
+                    stack.append(descend(listing(entry.path), depth + 1))
+                except OSError:
+                    # Unreadable subdirectories are skipped, like Path.rglob does.
+                    pass
+            elif _is_file(entry) and not (prune and pruned(entry)):
+                yield entry
+    finally:
+        if pool is not None:
+            for future in pending.values():
+                future.cancel()
+            pool.shutdown(wait=False)
+
+
+def sort_by_stat(entries, sort, reverse=False):
+    """
+    Return ``entries`` sorted by the ``STAT_ORDERS`` key named ``sort``.
+
+    Each key is computed once per entry from ``entry.stat()``, which reuses
+    the result ``os.DirEntry`` caches. Ties keep scan order; entries that
+    vanished before they could be stat'ed are dropped.
+    """
+    field = STAT_ORDERS[sort]
+    keyed = []
+    for entry in entries:
+        try:
+            keyed.append((field(entry.stat()), entry))
+        except OSError:
+            continue
+    keyed.sort(key=lambda item: item[0], reverse=reverse)
+    return [entry for _, entry in keyed]
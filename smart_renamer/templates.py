@@ -0,0 +1,227 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import re
+import string
+import sys
+from datetime import datetime
+
+from .content import HASH_ALGORITHMS, token_getter
+from .filters import sre_parse
+from .media import MEDIA_TOKENS
+
+_FIELD_HEAD = re.compile(r"[^.\[]*")
+
+
+def suffix(name):
+    """Same as ``PurePath(name).suffix`` without building a path."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+def _sub_segments(regex, template):
+    """
+    Parse a ``re.sub`` template into ``[literal, group, literal, ...]``.
+
+    ``sre_parse.parse_template`` returns this list directly on Python 3.12+
+    and a ``(groups, literals)`` pair before that.
+    """
+    parsed = sre_parse.parse_template(template, regex)
+    if not isinstance(parsed, tuple):
+        return parsed
+    groups, literals = parsed
+    indices = iter(index for _, index in groups)
+    segments = []
+    literal = ""
+    for part in literals:
+        if part is None:
+            segments += [literal, next(indices)]
+            literal = ""
+        else:
+            literal += part
+    segments.append(literal)
+    return segments
+
+
+def compile_sub_template(regex, template):
+    """
+    Compile a pattern mode template (``\\1``, ``\\g<name>``) once.
+
+    Returns a replacement for ``regex.sub``. Python 3.12+ compiles and
+    caches string templates in C, so the template itself is returned there
+    once it parsed. Older versions expand it again for every file, so they
+    get a function joining precomputed literals with the matched groups.
+    """
+    segments = _sub_segments(regex, template)  # raises on a bad template
+    if sys.version_info >= (3, 12):
+        return template
+    if len(segments) == 1:
+        literal = segments[0]
+        return lambda match: literal
+    if len(segments) == 3:
+        head, index, tail = segments
+        return lambda match: head + (match.group(index) or "") + tail
+
+    literals = segments[0::2]
+    indices = segments[1::2]
+    first = literals[0]
+    rest = literals[1:]
+
+    def expand(match):
+        parts = [first]
+        for value, literal in zip(match.group(*indices), rest):
+            parts.append(value or "")
+            parts.append(literal)
+        return "".join(parts)
+
+    return expand
+
+
+def _escape(literal):
+    return literal.replace("{", "{{").replace("}", "}}")
+
+
+def _stat_time(attr):
+    def get(entry):
+        return datetime.fromtimestamp(getattr(entry.stat(), attr))
+
+    return get
+
+
+# File metadata tokens for increment templates: name -> (getter, default
+# spec). Getters take the scanned ``os.DirEntry`` and only run for files the
+# template is rendered for, so templates without them never stat anything.
+TOKENS = {
+    "mtime": (_stat_time("st_mtime"), "%Y%m%d_%H%M%S"),
+    "ctime": (_stat_time("st_ctime"), "%Y%m%d_%H%M%S"),
+    "size": (lambda entry: entry.stat().st_size, ""),
+    "inode": (lambda entry: entry.inode(), ""),
+}
+# Content digests, {sha256:12} keeps the first 12 hex digits.
+TOKENS.update((name, (token_getter(name), "")) for name in HASH_ALGORITHMS)
+# Header-only media tags ({exif_date}, {camera}, {width}, {artist}, ...).
+TOKENS.update(
+    (name, (token_getter(name), spec)) for name, spec in MEDIA_TOKENS.items()
+)
+
+
+class _Fields(dict):
+    """``format_map`` mapping that resolves metadata tokens on first use."""
+
+    def __init__(self, counter, match, entry):
+        super().__init__(match.groupdict(), counter=counter)
+        self.match = match
+        self.entry = entry
+
+    def __missing__(self, key):
+        if key == "ext":
+            value = suffix(self.match.string)
+        elif key in TOKENS:
+            value = TOKENS[key][0](self.entry)
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+def _with_tokens(render, tokens):
+    render.tokens = frozenset(tokens)
+    return render
+
+
+def compile_format_template(regex, template):
+    """
+    Compile an increment mode template (``{counter}``, ``{name}``,
+    ``{mtime:%Y%m%d}``) once.
+
+    Returns a ``render(counter, match, entry)`` function. Field names are
+    resolved here: ``counter`` becomes argument 0 and each named group,
+    ``{ext}`` (the matched name's extension) or metadata token from
+    ``TOKENS`` the next free position, so per file only the referenced
+    values are fetched and passed positionally to a prebuilt format string.
+    That skips building ``groupdict()`` and the per-file KeyError/IndexError
+    fallback, and ``entry`` is only stat'ed when a token needs it. Unknown
+    fields raise here instead of on the first matching file.
+
+    ``render.tokens`` holds the names of the tokens used (named groups
+    shadow tokens), so callers can prefetch them or skip appending the
+    extension when ``ext`` is among them.
+    """
+    groups = regex.groupindex
+    fields = list(string.Formatter().parse(template))
+    heads = [_FIELD_HEAD.match(name).group() for _, name, _, _ in fields if name]
+    tokens = [
+        head
+        for head in heads
+        if head not in groups and (head == "ext" or head in TOKENS)
+    ]
+    if any("{" in spec for _, name, spec, _ in fields if name):
+        # Nested specs such as {name:{width}} keep the slow path.
+        return _with_tokens(
+            lambda counter, match, entry: template.format_map(
+                _Fields(counter, match, entry)
+            ),
+            tokens,
+        )
+
+    sources = []
+    parts = []
+    for literal, name, spec, conversion in fields:
+        parts.append(_escape(literal))
+        if name is None:
+            continue
+        first = _FIELD_HEAD.match(name).group()
+        if first == "counter":
+            position = 0
+        elif first in groups or first in tokens:
+            if first not in sources:
+                sources.append(first)
+            position = sources.index(first) + 1
+            if first in TOKENS and first not in groups and name == first:
+                spec = spec or TOKENS[first][1]
+        elif first == "" or first.isdigit():
+            raise IndexError(f"Replacement index {first or 0} out of range")
+        else:
+            raise KeyError(first)
+        field = name[len(first) :]
+        if conversion:
+            field += "!" + conversion
+        if spec:
+            field += ":" + spec
+        parts.append("{%d%s}" % (position, field))
+
+    fmt = "".join(parts).format
+    names = [source for source in sources if source in groups]
+    if len(names) < len(sources):
+        getters = [_getter(source, groups) for source in sources]
+
+        def render(counter, match, entry):
+            return fmt(counter, *[get(match, entry) for get in getters])
+
+    elif not names:
+
+        def render(counter, match, entry):
+            return fmt(counter)
+
+    elif len(names) == 1:
+        name = names[0]
+
+        def render(counter, match, entry):
+            return fmt(counter, match.group(name))
+
+    else:
+
+        def render(counter, match, entry):
+            return fmt(counter, *match.group(*names))
+
+    return _with_tokens(render, tokens)
+
+
+def _getter(source, groups):
+    if source in groups:
+        return lambda match, entry: match.group(source)
+    if source == "ext":
+        return lambda match, entry: suffix(match.string)
+    get = TOKENS[source][0]
+    return lambda match, entry: get(entry)
@@ -0,0 +1,273 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from . import renamer
+from .executor import rename_noreplace
+from .guard import DEFAULT_TIMEOUT
+from .index import CachedEntry
+from .normalize import (
+    MAX_NAME_BYTES,
+    PROFILES,
+    UNICODE_FORMS,
+    compile_normalizer,
+    sanitize_filename,
+)
+from .rules import RenameRule
+from .scanner import list_dir
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this system")
+        self._libc = libc
+        self.fd = self._check(libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC))
+        self._watches = {}  # wd -> directory
+
+    @staticmethod
+    def _check(result):
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+    def add_watch(self, directory, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+        self._watches[self._check(wd)] = directory
+
+    def read_events(self):
+        """
+        Yield ``(directory, name, mask)`` for the events queued right now.
+        ``directory`` is None when the kernel queue overflowed.
+        """
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            start = offset + _EVENT.size
+            name = data[start : start + length].rstrip(b"\0")
+            offset = start + length
+            if mask & IN_Q_OVERFLOW:
+                yield None, "", mask
+            elif mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+            elif wd in self._watches:
+                yield self._watches[wd], os.fsdecode(name), mask
+
+    def close(self):
+        os.close(self.fd)
+
+
+def watch(
+    directory,
+    rule,
+    recursive=False,
+    settle=1.0,
+    flush_interval=60.0,
+    dry_run=False,
+    normalize=sanitize_filename,
+):
+    """
+    Rename files arriving in ``directory`` with ``rule`` until interrupted.
+
+    A file is handled once no event has been seen for it for ``settle``
+    seconds, so files still being written are left alone. Files that became
+    ready together are renamed in sorted order, and since the counter lives
+    on ``rule`` increment numbering continues across batches. A file whose
+    new name is taken is skipped rather than overwriting it. Applied renames
+    are logged as one history session every ``flush_interval`` seconds.
+    """
+    for warning in rule.risk_warnings:
+        print("⚠️ " + warning)
+    inotify = Inotify()
+    pending = {}  # path -> monotonic time of its last event
+    own_targets = set()  # names we renamed files to, to ignore their events
+    applied = []
+    last_flush = time.monotonic()
+
+    def add_directory(path, is_new):
+        inotify.add_watch(path)
+        if not recursive and not is_new:
+            return
+        for entry in list_dir(path):
+            if recursive and entry.is_dir(follow_symlinks=False):
+                add_directory(entry.path, is_new)
+            elif is_new:
+                # Files that landed before the watch was in place.
+                pending[entry.path] = time.monotonic()
+
+    def flush():
+        nonlocal applied, last_flush
+        if applied:
+            renamer.add_to_history(applied)
+            applied = []
+        last_flush = time.monotonic()
+
+    def rename(path):
+        folder, name = os.path.split(path)
+        if not os.path.isfile(path):
+            return
+        new_name = rule.new_name(name, CachedEntry(folder, name, "f"))
+        if rule.timed_out:
+            print(f"⚠️ Matching timed out on {name}, left unchanged.")
+            rule.timed_out.clear()
+        if new_name is None:
+            return
+        new_name = normalize(new_name)
+        if new_name == name:
+            return
+        new_path = os.path.join(folder, new_name)
+        print(f"  {name} -> {new_name}")
+        if dry_run:
+            return
+        try:
+            rename_noreplace(path, new_path)
+        except FileExistsError:
+            print(f"⚠️ Skipping {name}: {new_name} already exists.")
+            return
+        except OSError as e:
+            print(f"❌ Failed to rename {path} -> {new_path}: {e}")
+            return
+        own_targets.add(new_path)
+        applied.append((Path(path), Path(new_path)))
+
+    add_directory(os.fspath(directory), is_new=False)
+    print(f"👀 Watching {directory} for new files (Ctrl+C to stop)")
+    try:
+        while True:
+            now = time.monotonic()
+            timeouts = [flush_interval - (now - last_flush)] if applied else []
+            if pending:
+                timeouts.append(min(pending.values()) + settle - now)
+            timeout = max(min(timeouts), 0) if timeouts else None
+            select.select([inotify.fd], [], [], timeout)
+
+            now = time.monotonic()
+            for folder, name, mask in inotify.read_events():
+                if folder is None:
+                    print("⚠️ Event queue overflowed; some new files may be missed.")
+                    continue
+                path = os.path.join(folder, name)
+                if mask & IN_ISDIR:
+                    if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        add_directory(path, is_new=True)
+                    continue
+                if path in own_targets:
+                    if mask & IN_MOVED_TO:
+                        own_targets.discard(path)
+                    continue
+                pending[path] = now
+
+            ready = [path for path, seen in pending.items() if now - seen >= settle]
+            for path in sorted(ready, key=Path):
+                del pending[path]
+                rename(path)
+
+            if applied and now - last_flush >= flush_interval:
+                flush()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped watching.")
+    finally:
+        flush()
+        inotify.close()
+        rule.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="smart_renamer watch",
+        description="Rename new files as they arrive in a directory (Linux only).",
+    )
+    parser.add_argument("directory", help="Directory to watch")
+    parser.add_argument("match_pattern", help="Regex pattern to match filenames")
+    parser.add_argument(
+        "replace_pattern", help="Replacement pattern. Use {counter} for increment mode."
+    )
+    parser.add_argument("--mode", choices=["pattern", "increment"], default="pattern")
+    parser.add_argument(
+        "--start", type=int, default=1, help="Starting number for increment mode"
+    )
+    parser.add_argument(
+        "--match-glob",
+        help="Glob files must match before the regex is tried, ie. *.txt",
+    )
+    parser.add_argument(
+        "--recursive", action="store_true", help="Also watch subdirectories"
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=1.0,
+        help="Seconds a file must be quiet before it is renamed",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between history sessions",
+    )
+    parser.add_argument(
+        "--regex-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds per file for patterns prone to catastrophic backtracking",
+    )
+    parser.add_argument("--normalize", choices=PROFILES, default="windows")
+    parser.add_argument("--unicode-form", choices=UNICODE_FORMS)
+    parser.add_argument("--max-name-bytes", type=int, default=MAX_NAME_BYTES)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Show renames only, don’t rename"
+    )
+    args = parser.parse_args(argv)
+
+    directory = Path(args.directory).resolve()
+    if not directory.is_dir():
+        print(f"❌ Error: {directory} is not a valid directory.")
+        return
+
+    rule = RenameRule(
+        args.match_pattern,
+        args.replace_pattern,
+        args.mode,
+        args.start,
+        args.match_glob,
+        args.regex_timeout,
+    )
+    try:
+        watch(
+            directory,
+            rule,
+            args.recursive,
+            args.settle,
+            args.flush_interval,
+            args.dry_run,
+            compile_normalizer(args.normalize, args.unicode_form, args.max_name_bytes),
+        )
+    except OSError as e:
+        print(f"❌ Error: cannot watch {directory}: {e}")
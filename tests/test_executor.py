@@ -0,0 +1,34 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+from pathlib import Path
+
+import pytest
+
+from smart_renamer.executor import execute_plan, rename_noreplace
+from smart_renamer.plan import resolve_plan
+
+
+def test_relative_paths_in_current_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    a, b = Path("a.txt"), Path("b.txt")
+    a.write_text("a")
+    b.write_text("b")
+    steps, _ = resolve_plan([(a, b), (b, a)])
+    failures = []
+
+    assert len(list(execute_plan(steps, failures=failures))) == 3
+    assert not failures
+    assert a.read_text() == "b"
+    assert b.read_text() == "a"
+
+
+def test_rename_noreplace_keeps_existing_target(tmp_path):
+    new, taken = tmp_path / "new.jpg", tmp_path / "img_1.jpg"
+    new.write_text("new")
+    taken.write_text("original")
+
+    with pytest.raises(FileExistsError):
+        rename_noreplace(new, taken)
+
+    assert new.read_text() == "new"
+    assert taken.read_text() == "original"
@@ -0,0 +1,46 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import fnmatch
+import itertools
+import re
+
+import pytest
+
+from smart_renamer.filters import compile_glob, compile_literal_filter
+
+ALPHABET = "ab.1_"
+NAMES = [
+    "".join(chars)
+    for length in range(6)
+    for chars in itertools.product(ALPHABET, repeat=length)
+]
+PATTERNS = [
+    r"^ab",
+    r"\.1$",
+    r"a_b",
+    r"^a.*b\.1\Z",
+    r"(ab|a1)_",
+    r"^(?:a|b)b\.",
+    r"a?b_1",
+    r"\Aa(b)1$",
+    r"b{2}",
+    r"^a\.|1$",
+]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_literal_filter_never_rejects_a_match(pattern):
+    regex = re.compile(pattern)
+    keep = compile_literal_filter(regex)
+    if keep is None:
+        return
+    for name in NAMES:
+        if regex.search(name):
+            assert keep(name), name
+
+
+@pytest.mark.parametrize("pattern", ["*.1", "a*", "*", "?b*_", "[ab]*.1", "a.1"])
+def test_glob_agrees_with_fnmatch(pattern):
+    match = compile_glob(pattern)
+    for name in NAMES:
+        assert match(name) == fnmatch.fnmatch(name, pattern), name
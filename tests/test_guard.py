@@ -0,0 +1,22 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import re
+
+import pytest
+
+from smart_renamer.guard import find_catastrophic
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"(a+)+$", r"(a|a)*$", r"^(a+){12}b", r"(a*){2,}x", r"(a|a){8}b"],
+)
+def test_flags_nested_and_overlapping_repeats(pattern):
+    assert find_catastrophic(re.compile(pattern))
+
+
+@pytest.mark.parametrize(
+    "pattern", [r"^(\d+)_(\w+)\.txt$", r"(a+)?b", r"(ab){3}", r"^IMG_(\d{4})"]
+)
+def test_leaves_linear_patterns_alone(pattern):
+    assert find_catastrophic(re.compile(pattern)) is None
@@ -0,0 +1,20 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+from smart_renamer.plan import resolve_plan
+
+
+def test_fold_suffix_skips_names_claimed_by_other_renames(tmp_path):
+    (tmp_path / "A.txt").write_text("A")
+    x, y = tmp_path / "x.txt", tmp_path / "y.txt"
+    x.write_text("x")
+    y.write_text("y")
+
+    steps, skipped = resolve_plan(
+        [(x, tmp_path / "a.txt"), (y, tmp_path / "a_2.txt")], fold="suffix"
+    )
+
+    assert not skipped
+    assert sorted((old.name, new.name) for old, new in steps) == [
+        ("x.txt", "a_3.txt"),
+        ("y.txt", "a_2.txt"),
+    ]
@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import os
+from pathlib import Path
+
+from smart_renamer.journal import JOURNAL_FILE, Journal, read_journal
+from smart_renamer.plan import resolve_plan
+from smart_renamer.renamer import LOG_FILE, recover
+
+
+def _interrupted_swap(tmp_path, monkeypatch):
+    """Journal an ``a <-> b`` swap as if the session died before renaming."""
+    monkeypatch.chdir(tmp_path)
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+    steps, skipped = resolve_plan([(a, b), (b, a)])
+    assert not skipped and len(steps) == 3
+    journal = Journal()
+    journal.intend(steps)
+    return journal, a, b
+
+
+def test_rollback_of_unstarted_swap_keeps_files(tmp_path, monkeypatch):
+    journal, a, b = _interrupted_swap(tmp_path, monkeypatch)
+    journal.close(remove=False)
+
+    recover(rollback=True, auto_confirm=True)
+
+    assert a.read_text() == "a"
+    assert b.read_text() == "b"
+    assert not Path(JOURNAL_FILE).exists()
+
+
+def test_unstarted_swap_is_pending(tmp_path, monkeypatch, capsys):
+    journal, a, b = _interrupted_swap(tmp_path, monkeypatch)
+    journal.close(remove=False)
+
+    recover(auto_confirm=True)
+
+    assert "0 renames applied, 3 pending" in capsys.readouterr().out
+    assert a.read_text() == "b"
+    assert b.read_text() == "a"
+    assert Path(LOG_FILE).exists()
+
+
+def test_exchange_interrupted_before_done_record(tmp_path, monkeypatch, capsys):
+    journal, a, b = _interrupted_swap(tmp_path, monkeypatch)
+    journal.exchanging(a, b)
+    journal.close(remove=False)
+    # The swap happened, as one exchange would leave it: no temporary name.
+    os.rename(a, tmp_path / "c.txt")
+    os.rename(b, a)
+    os.rename(tmp_path / "c.txt", b)
+    assert not read_journal()[3][(a, b)][2]
+
+    recover(rollback=True, auto_confirm=True)
+
+    assert "3 renames applied, 0 pending" in capsys.readouterr().out
+    assert a.read_text() == "a"
+    assert b.read_text() == "b"
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+from smart_renamer.renamer import confirm_and_apply, iter_rename_plan
+
+
+def test_dry_run_skips_what_a_real_run_skips(tmp_path, capsys):
+    for name in ("1.txt", "2.txt", "3.txt"):
+        (tmp_path / name).write_text(name)
+
+    changes = iter_rename_plan(tmp_path, r"^\d", "x")
+    confirm_and_apply(changes, dry_run=True)
+
+    out = capsys.readouterr().out
+    assert "Skipping 2 renames" in out
+    assert "Preview: 1 files will be renamed" in out
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["1.txt", "2.txt", "3.txt"]
+
+
+def test_dry_run_summary_counts_collisions(tmp_path, capsys):
+    for name in ("1.txt", "2.txt", "3.txt"):
+        (tmp_path / name).write_text(name)
+
+    changes = iter_rename_plan(tmp_path, r"^\d", "x")
+    confirm_and_apply(changes, dry_run=True, preview_summary=True)
+
+    assert "2 skipped as collisions" in capsys.readouterr().out
+
+
+def test_timeouts_are_reported_after_the_preview(tmp_path, capsys):
+    (tmp_path / "a1.txt").write_text("")
+    (tmp_path / ("a" * 40 + "!1.txt")).write_text("")
+
+    timed_out = []
+    changes = iter_rename_plan(
+        tmp_path, r"^(a+)+1", "b", regex_timeout=0.2, timed_out=timed_out
+    )
+    confirm_and_apply(changes, dry_run=True, timed_out=timed_out)
+
+    out = capsys.readouterr().out
+    assert timed_out
+    assert out.index("a1.txt -> b.txt") < out.index("Matching timed out")
@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import os
+
+from smart_renamer.content import ContentEntry, Digest
+from smart_renamer.rules import RenameRule, RulePipeline
+
+
+def test_risky_rule_reports_instead_of_printing(capsys):
+    rule = RenameRule(r"^(a+)+1", "b", timeout=0.5)
+    try:
+        assert capsys.readouterr().out == ""
+        assert rule.risk
+        assert "0.5s limit" in rule.risk_warnings[0]
+        assert RulePipeline([rule]).risk_warnings == rule.risk_warnings
+    finally:
+        rule.close()
+
+
+def test_unguarded_rule_has_no_warnings():
+    assert RenameRule(r"^(a+)+1", "b", timeout=0).risk_warnings == []
+
+
+def _rename_all(rule, names, entry=None):
+    try:
+        return [rule.new_name(name, entry) for name in names]
+    finally:
+        rule.close()
+
+
+def test_guarded_rule_renders_like_the_plain_one():
+    names = ["a1_x.txt", "aa1_y.jpg", "b1.txt", "aaa1"]
+    for mode, template in (
+        ("increment", "{run}_{counter}_{tail}{ext}"),
+        ("pattern", r"\g<tail>-\1"),
+    ):
+        pattern = r"^(?P<run>(a+)+)1_?(?P<tail>\w*)"
+        guarded = RenameRule(pattern, template, mode, timeout=5)
+        plain = RenameRule(pattern, template, mode, timeout=0)
+        assert guarded.risk_warnings
+        assert _rename_all(guarded, names) == _rename_all(plain, names)
+
+
+def test_guarded_rule_uses_prefetched_content(tmp_path):
+    path = tmp_path / "a1.bin"
+    path.write_bytes(b"data")
+    with os.scandir(tmp_path) as it:
+        entry = ContentEntry(next(it), {"sha256": Digest("f" * 64)})
+
+    rule = RenameRule(r"^(a+)+1", "{sha256:8}{ext}", "increment", timeout=5)
+    assert _rename_all(rule, [entry.name], entry) == ["ffffffff.bin"]
+
+
+def _rules():
+    return [
+        RenameRule(r"^IMG_(\d+)", r"photo_\1"),
+        RenameRule(r"^IMG_1", r"first"),
+        RenameRule(r"^(?P<kind>DSC|IMG)_", "{kind}_{counter}", "increment"),
+        RenameRule(r"(\d+)$", r"n\1"),
+        RenameRule(r"^DSC", r"camera", match_glob="*.jpg"),
+    ]
+
+
+def test_first_match_picks_the_rule_sequential_order_would():
+    names = ["IMG_1.jpg", "IMG_x.png", "DSC_2.jpg", "DSC_3.raw", "a12", "plain"]
+    pipeline = RulePipeline(_rules())
+    assert pipeline._any_match is not None  # the combined matcher is in use
+
+    expected = []
+    rules = _rules()
+    for name in names:
+        new_names = (rule.new_name(name) for rule in rules)
+        expected.append(next((new for new in new_names if new is not None), None))
+
+    assert [pipeline.new_name(name) for name in names] == expected
@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from smart_renamer import scanner
+from smart_renamer.scanner import scan_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path in ("b/x.txt", "a/B/c.txt", "a/a.txt", "a/B/d/e.txt", "z.txt", "A.txt"):
+        file = tmp_path / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(path)
+    for i in range(30):
+        (tmp_path / "many" / f"d{i}").mkdir(parents=True)
+        (tmp_path / "many" / f"d{i}" / "f.txt").write_text("")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_recursive_order_matches_sorted_rglob(tree, workers):
+    expected = [p for p in sorted(tree.rglob("*")) if p.is_file()]
+    got = [entry.path for entry in scan_files(tree, True, workers)]
+    assert got == [str(p) for p in expected]
+
+
+def test_flat_order_matches_sorted_iterdir(tree):
+    expected = [str(p) for p in sorted(tree.iterdir()) if p.is_file()]
+    assert [entry.path for entry in scan_files(tree)] == expected
+
+
+def test_prefetch_is_bounded(tree, monkeypatch):
+    submitted = []
+
+    class Pool(ThreadPoolExecutor):
+        def submit(self, fn, path):
+            submitted.append(path)
+            return super().submit(fn, path)
+
+    monkeypatch.setattr(scanner, "ThreadPoolExecutor", Pool)
+    entries = scan_files(tree, True, 2)
+    for entry in entries:
+        if entry.path.endswith("d0/f.txt"):
+            break
+    entries.close()
+    # The 30 directories under "many" are not all listed ahead at once:
+    # two workers keep at most eight listings ahead of the six walked.
+    assert 0 < len(submitted) <= 6 + 2 * 4
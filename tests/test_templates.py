@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Coby Amar
+import re
+import sys
+
+import pytest
+
+from smart_renamer.templates import compile_format_template, compile_sub_template
+
+NAMES = ["IMG_0001_beach.jpg", "IMG_12_.png", "IMG__x", "no match", "IMG_7_a IMG_8_b"]
+SUB_TEMPLATES = [
+    r"photo_\1_\2",
+    r"\2",
+    r"fixed",
+    r"\g<num>-\g<2>\g<0>",
+    r"[\1]\n",
+]
+
+
+@pytest.mark.parametrize("version", [(3, 11), (3, 12)])
+@pytest.mark.parametrize("template", SUB_TEMPLATES)
+def test_sub_template_matches_re_sub(template, version, monkeypatch):
+    monkeypatch.setattr(sys, "version_info", version)
+    regex = re.compile(r"IMG_(?P<num>\d*)_(\w*)")
+    expand = compile_sub_template(regex, template)
+    assert isinstance(expand, str) == (version >= (3, 12))
+    for name in NAMES:
+        assert regex.sub(expand, name) == regex.sub(template, name)
+
+
+def test_bad_sub_template_fails_at_compile_time():
+    with pytest.raises(re.error):
+        compile_sub_template(re.compile(r"(a)"), r"\2")
+
+
+FORMAT_TEMPLATES = [
+    "{counter}",
+    "{name}_{counter:04d}",
+    "{counter}-{name!r}-{num:>5}",
+    "{{literal}}_{name[0]}_{counter:x}",
+    "{num}{name}{counter}{name}",
+]
+
+
+@pytest.mark.parametrize("template", FORMAT_TEMPLATES)
+def test_format_template_matches_str_format(template):
+    regex = re.compile(r"(?P<name>[a-z]+)_(?P<num>\d*)")
+    render = compile_format_template(regex, template)
+    for counter, name in enumerate(["beach_0001.jpg", "x_", "long_name_42"], 1):
+        match = regex.search(name)
+        expected = template.format(counter=counter, **match.groupdict())
+        assert render(counter, match, None) == expected